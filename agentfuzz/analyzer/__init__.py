@@ -1,3 +1,4 @@
+import copy
 import os
 
 from agentfuzz.analyzer.static import APIGadget, ASTParser, GNUGlobal, TypeGadget
@@ -5,6 +6,49 @@ from agentfuzz.analyzer.dynamic import Compiler, Coverage, Fuzzer
 from agentfuzz.config import Config
 
 
+def _walk_files(top: str, postfix: tuple[str, ...]) -> list[str]:
+    """Listup the files with the given postfix under the directory, in the same order with `os.walk`.
+    Args:
+        top: a path to the directory.
+        postfix: the postfixes of the files to retrieve.
+    Returns:
+        list of paths to the files, joined with `top`.
+    """
+    found, stack = [], [top]
+    while stack:
+        dirs = []
+        try:
+            # use the cached file types of the entries, free from the additional stats
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        # do not follow the symbolic links, as `os.walk` does
+                        if not entry.is_symlink():
+                            dirs.append(entry.path)
+                    elif entry.name.endswith(postfix):
+                        found.append(entry.path)
+        except OSError:
+            continue
+        stack.extend(reversed(dirs))
+    return found
+
+
+def _unwrap(gadgets: list | RuntimeError) -> list:
+    """Copy the memoized gadgets, or raise the memoized error of the kind.
+    Args:
+        gadgets: list of the gadgets, or the error if failed to parse them.
+    Returns:
+        a copy of the list, the gadgets are shared across the calls and supposed to be read-only.
+    """
+    if isinstance(gadgets, RuntimeError):
+        raise RuntimeError(*gadgets.args) from gadgets.__cause__
+    return list(gadgets)
+
+
 class Factory:
     """Analyze the project and retrieve the knowledges for LLM.
 
@@ -33,6 +77,8 @@ class Factory:
         self.tags = GNUGlobal.gtags(
             self.config.srcdir, tagdir=os.path.join(self.workdir, "tags")
         )
+        # memoized gadgets, (APIS, TYPES) or the errors, until `refresh`
+        self._gadgets: tuple[list | Exception, list | Exception] | None = None
 
     def listup_files(self) -> list[tuple[str, str]]:
         """(Non-LLM API) Listup the files which containing the API Gadgets.
@@ -41,14 +87,10 @@ class Factory:
         Returns:
             list of paths to the source files.
         """
+        srcdir = self.config.srcdir
         return [
-            (
-                self.config.srcdir,
-                os.path.relpath(os.path.join(root, filename), self.config.srcdir),
-            )
-            for root, _, files in os.walk(self.config.srcdir)
-            for filename in files
-            if filename.endswith(tuple(self.config.postfix))
+            (srcdir, os.path.relpath(path, srcdir))
+            for path in _walk_files(srcdir, tuple(self.config.postfix))
         ]
 
     def listup_apis(self) -> list[APIGadget]:
@@ -56,39 +98,72 @@ class Factory:
         Returns:
             list of the APIs from the project, which will be used to generate harness.
         """
-        apis = {}
-        for mother, relpath in self.listup_files():
-            full = os.path.join(mother, relpath)
-            try:
-                for gadget in self.parser.parse_api_gadget(full):
-                    if gadget.signature() in apis:
-                        continue
-                    # WARNING: inplace operation
-                    gadget._meta["__source__"] = relpath
-                    apis[gadget.signature()] = gadget
-            except Exception as e:
-                raise RuntimeError(
-                    f"failed to parse the APIs from file `{full}`"
-                ) from e
-        return list(apis.values())
+        apis, _ = self._listup_gadgets()
+        return _unwrap(apis)
 
     def listup_types(self) -> list[TypeGadget]:
         """(None-LLM API) Listup the user-defined types.
         Returns:
             list of types from the projects.
         """
-        types = {}
+        _, types = self._listup_gadgets()
+        return _unwrap(types)
+
+    def listup_gadgets(self) -> tuple[list[APIGadget], list[TypeGadget]]:
+        """(Non-LLM API) Listup both the APIs and the user-defined types in a single traversal.
+        Returns:
+            list of the APIs and list of the types from the project.
+        """
+        apis, types = self._listup_gadgets()
+        return _unwrap(apis), _unwrap(types)
+
+    def refresh(self):
+        """(Non-LLM API) Drop the memoized gadgets, re-parse the source files on the next listup."""
+        self._gadgets = None
+
+    def _listup_gadgets(
+        self,
+    ) -> tuple[list[APIGadget] | RuntimeError, list[TypeGadget] | RuntimeError]:
+        """Listup the APIs and the types, memoized until `refresh` is called.
+        Returns:
+            list of the APIs and list of the types,
+                or the error of the kind if failed to parse it from any of the files.
+        """
+        if self._gadgets is not None:
+            return self._gadgets
+        found = {"APIs": {}, "types": {}}
         for mother, relpath in self.listup_files():
             full = os.path.join(mother, relpath)
             try:
-                for gadget in self.parser.parse_type_gadget(full):
-                    if gadget.signature() in types:
+                parsed = dict(zip(found, self.parser.parse_gadgets(full)))
+            except Exception:
+                # parse the kinds separately, a failure of one does not fail the other
+                parsed = {}
+                for kind, parse in zip(
+                    found, (self.parser.parse_api_gadget, self.parser.parse_type_gadget)
+                ):
+                    if isinstance(found[kind], RuntimeError):
                         continue
-                    # WARNING: inplace operation
-                    gadget._meta["__source__"] = relpath
-                    types[gadget.signature()] = gadget
-            except Exception as e:
-                raise RuntimeError(
-                    f"failed to parse the types from file `{full}`"
-                ) from e
-        return list(types.values())
+                    try:
+                        parsed[kind] = parse(full)
+                    except Exception as e:
+                        found[kind] = RuntimeError(
+                            f"failed to parse the {kind} from file `{full}`"
+                        )
+                        found[kind].__cause__ = e
+            for kind, gadgets in parsed.items():
+                if isinstance(found[kind], RuntimeError):
+                    continue
+                for gadget in gadgets:
+                    if gadget.signature() in found[kind]:
+                        continue
+                    # copy the gadget, the parser may share it with its own caches
+                    gadget = copy.copy(gadget)
+                    gadget._meta = {**gadget._meta, "__source__": relpath}
+                    found[kind][gadget.signature()] = gadget
+        apis, types = [
+            gadgets if isinstance(gadgets, RuntimeError) else list(gadgets.values())
+            for gadgets in found.values()
+        ]
+        self._gadgets = (apis, types)
+        return apis, types
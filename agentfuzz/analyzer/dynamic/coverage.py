@@ -54,6 +54,12 @@ class Coverage:
         """Compute the branch coverage."""
         return len(self.flat(nonzero=True)) / max(len(self.flat(nonzero=False)), 1)
 
+    @property
+    def coverage_lines(self) -> float:
+        """Compute the line coverage."""
+        hits = [hit for lines in self.lines.values() for hit in lines.values()]
+        return sum(hit > 0 for hit in hits) / max(len(hits), 1)
+
     def merge(self, other: "Coverage"):
         """Merge with the other one.
         Args:
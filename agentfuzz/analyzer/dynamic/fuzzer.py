@@ -1,5 +1,8 @@
+from time import sleep
 from typing import Iterator
 
+from tqdm.auto import tqdm
+
 from agentfuzz.analyzer.dynamic.coverage import Coverage
 
 
@@ -58,6 +61,43 @@ class Fuzzer:
             cov_fuzz = self.coverage(itself=True)
             yield corpus_dir, retn, (cov_lib, cov_fuzz)
 
+    def batch_coverage(
+        self,
+        corpus_dirs: list[str],
+        batch_size: int,
+        fuzzdict: str | None = None,
+        timeout: float | None = 300,
+        runs: int | None = None,
+        verbose: bool = False,
+    ) -> tuple[Coverage, Coverage, list[tuple[str, Exception]]]:
+        """Run the compiled harness in batch and accumulate the coverages of all runs.
+        Args:
+            corpus_dirs: a list of corpus directories.
+            batch_size: the desired concurrency level, maybe a size of the batch, or the number of the process.
+            fuzzdict: a path to the fuzzing dictionary file.
+            timeout: the maximum running time in seconds, None or indefinitely run.
+            runs: the number of individual tests, None for indefinitely run.
+            verbose: whether display the progress bar or not.
+        Returns:
+            Coverage: the accumulated coverage descriptors about library.
+            Coverage: the accumulated coverage descriptors about fuzzer-itself.
+            list[tuple[str, Exception]]: the failed corpus directories and their exceptions.
+        """
+        cov_lib, cov_fuzz, failures = Coverage(), Coverage(), []
+        iter_ = self.batch_run(
+            corpus_dirs, batch_size, fuzzdict, timeout, runs, return_cov=True
+        )
+        if verbose:
+            iter_ = tqdm(iter_, total=len(corpus_dirs))
+        for corpus_dir, retn, covs in iter_:
+            if covs is None:
+                failures.append((corpus_dir, retn))
+                continue
+            _cov_lib, _cov_fuzz = covs
+            cov_lib.merge(_cov_lib)
+            cov_fuzz.merge(_cov_fuzz)
+        return cov_lib, cov_fuzz, failures
+
     def run(
         self,
         corpus_dir: str | None = None,
@@ -89,6 +129,13 @@ class Fuzzer:
         """
         raise NotImplementedError("Fuzzer.poll is not implemented.")
 
+    def wait(self, timeout: float):
+        """Wait for the fuzzer process to exit, at most `timeout` seconds.
+        Args:
+            timeout: the maximum waiting time in seconds.
+        """
+        sleep(timeout)
+
     def halt(self) -> int | Exception:
         """Stop the fuzzer.
         Returnss:
@@ -70,6 +70,15 @@ class ASTParser:
         """
         raise NotImplementedError("ASTParser.parse_api_gadget is not implemented")
 
+    def parse_gadgets(self, source: str) -> tuple[list[APIGadget], list[TypeGadget]]:
+        """Parse both the API and the declared type infos from the source code.
+        Args:
+            source: a path to the source code file.
+        Returns:
+            a list of API gadgets and a list of type gadgets.
+        """
+        return self.parse_api_gadget(source), self.parse_type_gadget(source)
+
     def extract_critical_path(
         self, source: str, gadgets: list[APIGadget]
     ) -> list[list[tuple[str | APIGadget, int | None]]]:
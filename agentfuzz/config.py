@@ -4,6 +4,10 @@ from typing import TextIO
 
 import yaml
 
+# libyaml-backed loader and dumper, if pyyaml is built with it
+_YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAMLDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 @dataclass
 class Config:
@@ -42,7 +46,7 @@ class Config:
             the loaded configuration.
         """
         with open(path) as f:
-            loaded = yaml.safe_load(f)
+            loaded = yaml.load(f, Loader=_YAMLLoader)
         return cls(**loaded)
 
     def dump(self, f: TextIO):
@@ -50,7 +54,7 @@ class Config:
         Args:
             f: writing stream.
         """
-        yaml.safe_dump(asdict(self), f)
+        yaml.dump(asdict(self), f, Dumper=_YAMLDumper)
 
     @classmethod
     def load_from_json(cls, path: str):
@@ -154,7 +154,7 @@ class HarnessGenerator:
             shutil.copytree(config.corpus_dir, corpus_dir)
 
         # listup the apis and types
-        apis, types = self.factory.listup_apis(), self.factory.listup_types()
+        apis, types = self.factory.listup_gadgets()
 
         # construct mutator
         _latest = os.path.join(self._dir_state, "latest.json")
@@ -3,9 +3,7 @@ import shutil
 import tempfile
 import traceback
 from dataclasses import dataclass
-from time import sleep, time
-
-from tqdm.auto import tqdm
+from time import time
 
 from agentfuzz.analyzer import APIGadget, Coverage, Factory, Fuzzer
 from agentfuzz.logger import Logger
@@ -164,7 +162,7 @@ class HarnessValidator:
         )
         if self.logger is not None:
             self.logger.log(
-                f"Success to collect the coverage({time() - start:.2f}s, lib: {cov_lib.coverage_branch * 100:.2f}%, fuzzer: {cov_fuzz.coverage_branch * 100:.2f}%)."
+                f"Success to collect the coverage({time() - start:.2f}s, lib: {cov_lib.coverage_branch * 100:.2f}%, fuzzer lines: {cov_fuzz.coverage_lines * 100:.2f}%)."
             )
 
         ## 5. Coverage growth
@@ -251,13 +249,13 @@ class HarnessValidator:
                 runs=None,
             )
             last_cov = 0
-            # initial trial
-            sleep(interval)
+            # initial trial, wake up early if the fuzzer exits
+            fuzzer.wait(interval)
             while fuzzer.poll() is None:
                 if last_cov >= (current := fuzzer.track()):
                     break
                 last_cov = current
-                sleep(interval)
+                fuzzer.wait(interval)
             fuzzer.halt()
         except Exception as e:
             return FuzzerError(e, traceback.format_exc())
@@ -280,7 +278,6 @@ class HarnessValidator:
         Returns:
             coverage about the library and fuzzer itself.
         """
-        cov_lib, cov_fuzz = Coverage(), Coverage()
         # minimize the corpus first
         if minimized := fuzzer.minimize(corpus_dir, tempfile.mkdtemp()):
             shutil.rmtree(corpus_dir)
@@ -288,35 +285,25 @@ class HarnessValidator:
         # run individual corpora
         _corpus_dirs = []
         _workdir = tempfile.mkdtemp()
-        for corpora in os.listdir(corpus_dir):
-            _corpus_dir = os.path.join(_workdir, corpora)
-            os.makedirs(_corpus_dir, exist_ok=True)
-            shutil.copy(
-                os.path.join(corpus_dir, corpora),
-                os.path.join(_corpus_dir, "CORPORA"),
-            )
-            _corpus_dirs.append(_corpus_dir)
-        # batch supports
-        iter_ = fuzzer.batch_run(
+        with os.scandir(corpus_dir) as it:
+            for corpora in it:
+                _corpus_dir = os.path.join(_workdir, corpora.name)
+                os.makedirs(_corpus_dir, exist_ok=True)
+                shutil.copy(corpora.path, os.path.join(_corpus_dir, "CORPORA"))
+                _corpus_dirs.append(_corpus_dir)
+        # batch supports, accumulate the coverages of all corpora
+        cov_lib, cov_fuzz, failures = fuzzer.batch_coverage(
             _corpus_dirs,
             batch_size=batch_size or os.cpu_count(),
             fuzzdict=fuzzdict,
             timeout=None,
             runs=1,
-            return_cov=True,
+            verbose=verbose,
         )
-        if verbose:
-            iter_ = tqdm(iter_, total=len(_corpus_dirs))
-        for _corpus_dir, retn, covs in iter_:
-            if covs is None:
-                if self.logger is not None:
-                    corpora = os.path.basename(_corpus_dir)
-                    self.logger.log(f"Failed to run the corpora {corpora}: {retn}")
-                continue
-            # merge to global cov
-            _cov_lib, _cov_fuzz = covs
-            cov_lib.merge(_cov_lib)
-            cov_fuzz.merge(_cov_fuzz)
+        if self.logger is not None:
+            for _corpus_dir, retn in failures:
+                corpora = os.path.basename(_corpus_dir)
+                self.logger.log(f"Failed to run the corpora {corpora}: {retn}")
 
         return cov_lib, cov_fuzz
 
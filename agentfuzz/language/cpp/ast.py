@@ -1,38 +1,340 @@
+import collections
+import hashlib
 import json
+import mmap
 import os
+import pickle
 import re
 import subprocess
 import tempfile
 import traceback
 import warnings
-from typing import Callable
+from typing import BinaryIO, Callable, TextIO
 
 from agentfuzz.analyzer.static.ast import APIGadget, ASTParser, TypeGadget
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from clang import cindex
+except ImportError:
+    cindex = None
+
+# TypeAliasDecl: using A = B;
+# TypedefDecl: typedef B A;
+# CXXRecordDecl: tagged by class, struct
+_TYPE_KINDS = frozenset({"TypeAliasDecl", "TypedefDecl", "CXXRecordDecl"})
+
+_FUNC_KINDS = frozenset({"FunctionDecl"})
+
+# libclang index, shared across the parsers to keep the runtime resident
+_LIBCLANG_INDEX = None
+
+# call instruction of LLVM IR, `%1 = call i32 @foo(...)`
+_CALL_STMT = re.compile(r"^(%\d+\s*=\s*)*call.+?@(.+?)\(.+$")
+# function type, `return_type (arguments)`
+_FUNC_TYPE = re.compile(r"^(.+?)\s*\((.*?)\)$")
+# inner body of the graphviz record label, `{...}`
+_DOT_BODY_INNER = re.compile(r"^\{(.+?)\}$")
+# node statement of the dot-file, `Node0x... [shape=record,label="{...}"];`
+_DOT_NODE = re.compile(r'^\s*(Node0x[0-9a-fA-F]+)\s*\[.*?label="((?:[^"\\]|\\.)*)"')
+# edge statement of the dot-file, `Node0x...:s0 -> Node0x...;`
+_DOT_EDGE = re.compile(r"^\s*(Node0x[0-9a-fA-F]+)(?::\w+)?\s*->\s*(Node0x[0-9a-fA-F]+)")
+# function definition of LLVM IR, `define i32 @foo(...) {`
+_IR_DEFINE = re.compile(r'^define\s[^@]*@("[^"]+"|[\w$.-]+)\(')
+# basic block label of LLVM IR, `5:` or `for.body:`
+_IR_LABEL = re.compile(r'^("[^"]+"|[\w$.-]+):')
+# successor of the terminator in LLVM IR, `br label %5`
+_IR_SUCCESSOR = re.compile(r'label %("[^"]+"|[\w$.-]+)')
+# debug metadata of LLVM IR, `!1 = ...`
+_DEBUG_META = re.compile(r"^!(\d+)")
+# reference to the debug location, `!dbg !12`
+_DEBUG_REF = re.compile(r"!dbg !(\d+)")
+# line number of the debug location, `!DILocation(line: 3, ...)`
+_DEBUG_LINE = re.compile(r"line: (\d+)")
+# parenthesis
+_PARENTHESIS = re.compile(r"[()]")
+# separators of the prerequisites in the make rule, except the escaped spaces
+_MAKE_SEP = re.compile(r"(?<!\\)\s+")
+# compiled patterns for the mangled API names
+_MANGLED_CACHE: dict[str, re.Pattern] = {}
+# parsed function types, `qualType` to the return type, arguments and post-qualifier
+_FUNC_TYPE_CACHE: dict[str, tuple[str, str, str]] = {}
+# prefix of the itanium-mangled name, `_Z`, `_ZN`, `_ZNK`, `_ZL`
+_ITANIUM_PREFIX = re.compile(r"^_Z(?:(N)[rVK]*[RO]?|L?)")
+# length of the source name in the itanium-mangled name
+_ITANIUM_LENGTH = re.compile(r"\d+")
+# substitution or template parameter, `S_`, `S0_`, `T_`, `T1_`
+_ITANIUM_REF = re.compile(r"[ST][0-9A-Z]*_")
+# standard substitutions, `St` for `std::`, `Sa` for `std::allocator`, ...
+_ITANIUM_STD = frozenset({"St", "Sa", "Sb", "Ss", "Si", "So", "Sd"})
+
+
+def _mangled(name: str) -> re.Pattern:
+    """Compile the pattern for finding the API from the mangled name, memoized.
+    Args:
+        name: the name of the API.
+    Returns:
+        compiled pattern.
+    """
+    if (pattern := _MANGLED_CACHE.get(name)) is None:
+        pattern = re.compile(f"^_Z.*\\d+{re.escape(name)}")
+        _MANGLED_CACHE[name] = pattern
+    return pattern
+
+
+def _unmangled_name(name: str) -> str | None:
+    """Retrieve the unqualified function name from the itanium-mangled name.
+    Args:
+        name: the mangled name, e.g. `_ZN2ns4wrapEv`.
+    Returns:
+        the unqualified name, e.g. `wrap`, None if the name is not supported.
+    """
+    if not (prefix := _ITANIUM_PREFIX.match(name)):
+        return None
+    nested, idx, found = prefix.group(1) == "N", prefix.end(), None
+    while idx < len(name):
+        if length := _ITANIUM_LENGTH.match(name, idx):
+            idx = length.end() + int(length.group())
+            found = name[length.end() : idx]
+        elif name[idx] == "I" and found is not None:
+            # template arguments of the preceding name
+            if (idx := _skip_template_args(name, idx)) is None:
+                return None
+            continue
+        elif not nested or found is None:
+            # unscoped name, `std::` or substituted prefix
+            if name[idx : idx + 2] in _ITANIUM_STD:
+                idx += 2
+            elif ref := _ITANIUM_REF.match(name, idx):
+                idx = ref.end()
+            else:
+                return None
+            continue
+        elif name[idx] in "CD" and name[idx + 1 : idx + 2] in ("0", "1", "2", "3"):
+            # constructor or destructor of the enclosing class
+            return found if name[idx] == "C" else f"~{found}"
+        elif name[idx] == "B" and (length := _ITANIUM_LENGTH.match(name, idx + 1)):
+            # abi tag, e.g. `B5cxx11`
+            idx = length.end() + int(length.group())
+            continue
+        elif name[idx] == "E":
+            return found
+        else:
+            # operators, local names and the others
+            return None
+        if not nested:
+            return found
+    return None
+
+
+def _skip_template_args(name: str, idx: int) -> int | None:
+    """Skip the template arguments, `I...E`, of the itanium-mangled name.
+    Args:
+        name: the mangled name.
+        idx: the index of the opening `I`.
+    Returns:
+        the index next to the closing `E`, None if the arguments are not supported.
+    """
+    depth = 0
+    while idx < len(name):
+        c = name[idx]
+        if length := _ITANIUM_LENGTH.match(name, idx):
+            idx = length.end() + int(length.group())
+            continue
+        if c in "INXJF":
+            # nested arguments, names, expressions, packs and function types
+            depth += 1
+        elif c == "E":
+            depth -= 1
+            if depth == 0:
+                return idx + 1
+        elif c == "L":
+            # literal, `Li3E`, the external names are not supported
+            if name.startswith("_Z", idx + 1) or (end := name.find("E", idx)) < 0:
+                return None
+            idx = end + 1
+            continue
+        elif c in "STA":
+            # substitutions, template parameters and array types, `A10_`
+            if name[idx : idx + 2] in _ITANIUM_STD:
+                idx += 2
+                continue
+            if (end := name.find("_", idx)) < 0:
+                return None
+            idx = end + 1
+            continue
+        elif c == "D":
+            # builtin types and pack expansions, `Dn`, `Dp`
+            idx += 1
+        idx += 1
+    return None
+
+
+def _dependencies(args: list[str]) -> dict[str, tuple[int, int]] | None:
+    """Collect the files the source depends on with `clang -MM`, the source itself and the included headers.
+    Args:
+        args: the command line of the clang, without `-MM`.
+    Returns:
+        {PATH: (MODIFICATION_TIME, SIZE)}, None if failed to preprocess the source.
+    """
+    proc = subprocess.run([*args, "-MM"], capture_output=True)
+    if proc.returncode != 0:
+        return None
+    # make rule, `target: source header1 header2 ...`, continued by the backslashes
+    rule = proc.stdout.decode("utf-8", errors="replace").replace("\\\n", " ")
+    _, _, prerequisites = rule.partition(": ")
+    deps = {}
+    try:
+        for path in _MAKE_SEP.split(prerequisites.strip()):
+            if path:
+                path = os.path.abspath(path.replace("\\ ", " "))
+                stat = os.stat(path)
+                deps[path] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+    return deps
+
+
+def _modified(deps: dict[str, tuple[int, int]]) -> bool:
+    """Check whether any of the dependencies is modified or removed.
+    Args:
+        deps: {PATH: (MODIFICATION_TIME, SIZE)}, from `_dependencies`.
+    Returns:
+        True if any of the files is modified.
+    """
+    try:
+        for path, (mtime, size) in deps.items():
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) != (mtime, size):
+                return True
+    except OSError:
+        return True
+    return False
+
+
+def _json_dumps(obj: dict) -> bytes:
+    """Serialize the object into the json document, use orjson if it is available.
+    Args:
+        obj: the json-serializable object.
+    Returns:
+        utf-8 encoded json document.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_load(f: BinaryIO) -> dict:
+    """Deserialize the json document from the file, memory-mapped if orjson is available.
+    Args:
+        f: a binary file object.
+    Returns:
+        deserialized object.
+    """
+    f.seek(0)
+    if orjson is None:
+        return json.load(f)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _longest_lengths(
+    body_off: list[int], succ: list[int], succ_off: list[int], entry: int = 0
+) -> tuple[list[int], list[bool], list[int]]:
+    """Compute the longest API lengths from the blocks to the exit blocks, with back edges removed.
+    Args:
+        body_off: the offsets of the APIs of the blocks.
+        succ: the successors of the blocks, flattened in order of the blocks.
+        succ_off: the offsets of the successors of the blocks.
+        entry: the index of the entry block.
+    Returns:
+        post-order of the reachable blocks from the entry,
+        flags of the back edges, aligned with `succ`,
+        and the longest API lengths, -1 if no exit block is reachable.
+    """
+    n = len(body_off) - 1
+    # iterative DFS for the post-order and back edges
+    order, back, state = [], [False] * len(succ), [0] * n
+    state[entry], stack = 1, [[entry, succ_off[entry]]]
+    while stack:
+        frame = stack[-1]
+        node, e = frame
+        end = succ_off[node + 1]
+        while e < end:
+            i = succ[e]
+            e += 1
+            # back edge, if the node is on the stack
+            if state[i] == 1:
+                back[e - 1] = True
+                continue
+            if state[i] == 0:
+                state[i] = 1
+                stack.append([i, succ_off[i]])
+                break
+        frame[1] = e
+        if e == end and stack[-1] is frame:
+            stack.pop()
+            state[node] = 2
+            order.append(node)
+    # longest API length to the exit blocks in topological order
+    best = [-1] * n
+    for node in order:
+        start, end = succ_off[node], succ_off[node + 1]
+        length = body_off[node + 1] - body_off[node]
+        if start == end:
+            best[node] = length
+            continue
+        longest = -1
+        for e in range(start, end):
+            if not back[e] and best[succ[e]] > longest:
+                longest = best[succ[e]]
+        if longest >= 0:
+            best[node] = length + longest
+    return order, back, best
+
 
 class CStyleAPIGadget(APIGadget):
+    # rendered signature, cached on the first call
+    _signature = None
+
     def signature(self) -> str:
         """Render the api gadget into C/C++ style declaration.
         Returns:
             `return_type name(list of arguments)`
         """
-        args = ", ".join(
-            f"{type_} {name or ''}".strip() for name, type_ in self.arguments
-        )
-        return f"{self.return_type} {self.name}({args})"
+        if self._signature is None:
+            args = ", ".join(
+                f"{type_} {name or ''}".strip() for name, type_ in self.arguments
+            )
+            self._signature = f"{self.return_type} {self.name}({args})"
+        return self._signature
 
 
 class CStyleTypeGadget(TypeGadget):
+    # rendered signature, cached on the first call
+    _signature = None
+
     def signature(self) -> str:
         """Render the type gadget into C/C++ style declaration."""
+        if self._signature is None:
+            self._signature = self._render()
+        return self._signature
+
+    def _render(self) -> str:
+        """Render the type gadget, without cache."""
         match self.tag:
             case "alias":
                 # using clause
-                if self._meta["node"]["kind"] == "TypeAliasDecl":
+                if self._meta["node_kind"] == "TypeAliasDecl":
                     return f"using {self.name} = {self.qualified};"
                 else:
                     # typedef clause
-                    # assert self._meta["node"]["kind"] == "TypedefDecl"
+                    # assert self._meta["node_kind"] == "TypedefDecl"
                     return f"typedef {self.qualified} {self.name};"
             case "class":
                 return f"class {self.name};"
@@ -44,19 +346,32 @@ class ClangASTParser(ASTParser):
     """Clang AST-based static analysis supports."""
 
     def __init__(
-        self, clang: int = "clang++", include_dir: list[str] = [], _max_cache: int = 500
+        self,
+        clang: int = "clang++",
+        include_dir: list[str] = [],
+        _max_cache: int = 500,
+        _cache_dir: str | None = None,
+        _libclang: bool = False,
     ):
         """Preare the clang ast parser.
         Args:
             clang: a path to the clang compiler.
             include_dir: a list of paths to the directories for `#incldue` preprocessor.
+            _cache_dir: a path to the directory for persistent dumping cache, disabled if it is not provided.
+            _libclang: parse the source code in-process with libclang if it is available,
+                instead of running the `clang -ast-dump=json` for every source file.
         """
         self.clang = clang
         self.include_dir = include_dir
         # for dumping cache
-        self._ast_caches = {}
-        self._cfg_caches = {}
+        self._ast_caches = collections.OrderedDict()
+        self._cfg_caches = collections.OrderedDict()
+        self._gadget_caches = collections.OrderedDict()
+        self._deps_caches = collections.OrderedDict()
         self._max_cache = _max_cache
+        self._cache_dir = _cache_dir
+        self._clang_version: str | None = None
+        self._libclang = _libclang and cindex is not None
 
     def parse_type_gadget(self, source: str) -> CStyleTypeGadget:
         """Parse the declared type infos from the header file.
@@ -65,56 +380,8 @@ class ClangASTParser(ASTParser):
         Returns:
             list of type gadgets.
         """
-        assert os.path.exists(source), f"FILE DOES NOT EXIST, {source}"
-        # parse tree, cache supports
-        top_node = self._parse_to_ast(source)
-        assert "error" not in top_node, top_node
-        # traversal
-        gadgets, stack = {}, [*top_node["inner"]]
-        while stack:
-            node = stack.pop()
-            # TypeAliasDecl: using A = B;
-            # TypedefDecl: typedef B A;
-            # CXXRecordDecl: tagged by class, struct
-            if node.get("kind") not in [
-                "TypeAliasDecl",
-                "TypedefDecl",
-                "CXXRecordDecl",
-            ]:
-                stack.extend(node.get("inner", []))
-                continue
-            # retrieve the file path (by #include macro)
-            loc = node.get("loc", {})
-            file = loc.get("file") or loc.get("includedFrom", {}).get("file")
-            if file is not None and file != source:
-                continue
-            # TODO: whether extend the stack or not
-            if "name" not in node:
-                continue
-
-            gadget = CStyleTypeGadget(
-                name=node.get("name"),
-                tag=node.get("tagUsed", "alias"),
-                qualified=node.get("type", {}).get("qualType", None),
-                _meta={"node": node},
-            )
-            if gadget.signature() not in gadgets:
-                gadgets[gadget.signature()] = gadget
-            # C++ allows nested type declaration
-            if "inner" in node:
-                stack.extend(
-                    [
-                        inner
-                        for inner in node["inner"]
-                        # CXXRecordDecl contains self in the inner.
-                        if not (
-                            node["kind"] == "CXXRecordDecl"
-                            and inner["kind"] == "CXXRecordDecl"
-                            and inner.get("name") == node["name"]
-                        )
-                    ]
-                )
-        return list(gadgets.values())
+        _, types = self._parse_gadgets(source, apis=False)
+        return types
 
     def parse_api_gadget(self, source: str) -> CStyleAPIGadget:
         """Parse the API infos from the header file.
@@ -123,57 +390,171 @@ class ClangASTParser(ASTParser):
         Returns:
             list of API gadgets.
         """
+        apis, _ = self._parse_gadgets(source, types=False)
+        return apis
+
+    def parse_gadgets(
+        self, source: str
+    ) -> tuple[list[CStyleAPIGadget], list[CStyleTypeGadget]]:
+        """Parse both the API and the declared type infos from the header file in a single traversal.
+        Args:
+            source: a path to the source code file.
+        Returns:
+            list of API gadgets and list of type gadgets.
+        """
+        return self._parse_gadgets(source)
+
+    def _parse_gadgets(
+        self, source: str, apis: bool = True, types: bool = True
+    ) -> tuple[list[CStyleAPIGadget], list[CStyleTypeGadget]]:
+        """Collect the gadgets from the declarations of the given header file.
+        Args:
+            source: a path to the source code file.
+            apis, types: whether to collect the API gadgets or the type gadgets.
+        Returns:
+            list of API gadgets and list of type gadgets, empty if not collected.
+        """
         assert os.path.exists(source), f"FILE DOES NOT EXIST, {source}"
-        # parse tree, cache supports
-        top_node = self._parse_to_ast(source)
-        with open("test.json", "w") as f:
-            json.dump(top_node, f, indent=2)
-        assert "error" not in top_node, top_node
-        # traversal
-        gadgets, stack = {}, [*top_node["inner"]]
+        _key = (*self._ast_cache_key(source), apis, types)
+        if _key in self._gadget_caches:
+            self._gadget_caches.move_to_end(_key)
+            parsed = self._gadget_caches[_key]
+            return list(parsed[0]), list(parsed[1])
+        # load from the persistent cache, skip the ast if the gadgets are dumped
+        _filename = self._cache_file(source, "gadgets.pkl", self._libclang, apis, types)
+        parsed = self._read_cache(_filename)
+        if parsed is None:
+            # the gadgets are derived from the ast, share its dependencies
+            deps = self._dependencies(source)
+            # parse tree, cache supports
+            top_node = self._parse_to_ast(source)
+            assert "error" not in top_node, top_node
+            api_gadgets, type_gadgets = {}, {}
+            for kind, node in self._walk(top_node, source, apis, types):
+                if kind in _FUNC_KINDS:
+                    gadget, gadgets = self._api_gadget(node), api_gadgets
+                else:
+                    gadget, gadgets = self._type_gadget(node), type_gadgets
+                if gadget is not None:
+                    gadgets.setdefault(gadget.signature(), gadget)
+            parsed = (list(api_gadgets.values()), list(type_gadgets.values()))
+            self._write_cache(_filename, parsed, deps)
+        self._update_cache(self._gadget_caches, _key, parsed)
+        return list(parsed[0]), list(parsed[1])
+
+    @classmethod
+    def _walk(cls, top_node: dict, source: str, apis: bool = True, types: bool = True):
+        """Traverse the AST and yield the function or type declarations of the given file.
+        Args:
+            top_node: the root node of the AST.
+            source: a path to the source code file.
+            apis: whether to yield the function declarations, `FunctionDecl`.
+            types: whether to yield the type declarations, `TypeAliasDecl`, `TypedefDecl` and `CXXRecordDecl`.
+        Returns:
+            generator of the pairs of the node kind and the node.
+        """
+        # (node, visible for the API walk, visible for the type walk)
+        stack = [(node, apis, types) for node in top_node.get("inner", ())]
+        push, pop = stack.append, stack.pop
         while stack:
-            node = stack.pop()
-            if node.get("kind") not in ["FunctionDecl"]:
-                stack.extend(node.get("inner", []))
+            node, api_, type_ = pop()
+            kind = node.get("kind")
+            # function declaration is not nested in the API walk
+            descend_api, descend_type = api_ and kind not in _FUNC_KINDS, type_
+            if kind in _FUNC_KINDS:
+                if api_ and cls._is_local(node, source):
+                    yield kind, node
+            elif kind in _TYPE_KINDS and type_:
+                # TODO: whether extend the stack or not
+                descend_type = "name" in node and cls._is_local(node, source)
+                if descend_type:
+                    yield kind, node
+            if not (descend_api or descend_type):
                 continue
-            # retrieve the file path (by #include macro)
-            loc = node.get("loc", {})
-            file = loc.get("file") or loc.get("includedFrom", {}).get("file")
-            if file is not None and file != source:
+            inner = node.get("inner")
+            if not inner:
                 continue
-            # function decl found
-            type_ = node["type"]["qualType"]
-            # parse type
-            _, (_, args_i), *_ = self._parse_parenthesis(type_)
-            ((return_t, args_t),) = re.findall(
-                r"^(.+?)\s*\((.*?)\)$", type_[: args_i + 1]
-            )
-            _post_qualifier = type_[args_i + 1 :]
-            # TODO: Mark as template parameter if `TemplateTypeParmDecl` taken
-            arguments = [
-                (subnode.get("name", None), subnode["type"]["qualType"])
-                for subnode in node.get("inner", [])
-                if subnode["kind"] == "ParmVarDecl"
-            ]
-            # for support variable argument
-            if args_t.endswith("..."):
-                arguments.append((None, "..."))
-            # sanity check
-            if args_t != ", ".join(t for _, t in arguments):
-                warnings.warn(
-                    f"invalid sanity: id `{node['id']}`, named `{node['name']}`"
-                    f" , originally `{args_t}`, but got `{arguments}`"
-                )
+            if kind != "CXXRecordDecl" or not descend_type:
+                for child in inner:
+                    push((child, descend_api, descend_type))
                 continue
-            gadget = CStyleAPIGadget(
-                name=node["name"],
-                return_type=return_t,
-                arguments=arguments,
-                _meta={"_post_qualifier": _post_qualifier, "node": node},
+            # C++ allows nested type declaration
+            name = node["name"]
+            for child in inner:
+                # CXXRecordDecl contains self in the inner.
+                self_ = child["kind"] == "CXXRecordDecl" and child.get("name") == name
+                push((child, descend_api, not self_))
+
+    @classmethod
+    def _is_local(cls, node: dict, source: str) -> bool:
+        """Check whether the node is declared in the given file.
+        Args:
+            node: the declaration node.
+            source: a path to the source code file.
+        Returns:
+            False if the node is included from the other file.
+        """
+        # retrieve the file path (by #include macro)
+        loc = node.get("loc")
+        if not loc:
+            return True
+        file = loc.get("file") or (
+            loc["includedFrom"].get("file") if "includedFrom" in loc else None
+        )
+        return file is None or file == source
+
+    @classmethod
+    def _type_gadget(cls, node: dict) -> CStyleTypeGadget:
+        """Construct the type gadget from the type declaration node.
+        Args:
+            node: the node of `TypeAliasDecl`, `TypedefDecl` or `CXXRecordDecl`.
+        Returns:
+            the type gadget.
+        """
+        return CStyleTypeGadget(
+            name=node.get("name"),
+            tag=node.get("tagUsed", "alias"),
+            qualified=node.get("type", {}).get("qualType", None),
+            _meta={"node_kind": node["kind"]},
+        )
+
+    def _api_gadget(self, node: dict) -> CStyleAPIGadget | None:
+        """Construct the API gadget from the function declaration node.
+        Args:
+            node: the node of `FunctionDecl`.
+        Returns:
+            the API gadget, None if the sanity check fails.
+        """
+        type_ = node["type"]["qualType"]
+        # parse type, the same type is shared across the declarations
+        if (parsed := _FUNC_TYPE_CACHE.get(type_)) is None:
+            _, (_, args_i), *_ = self._parse_parenthesis(type_)
+            ((return_t, args_t),) = _FUNC_TYPE.findall(type_[: args_i + 1])
+            parsed = (return_t, args_t, type_[args_i + 1 :])
+            _FUNC_TYPE_CACHE[type_] = parsed
+        return_t, args_t, _post_qualifier = parsed
+        # TODO: Mark as template parameter if `TemplateTypeParmDecl` taken
+        arguments = [
+            (subnode.get("name", None), subnode["type"]["qualType"])
+            for subnode in node.get("inner", ())
+            if subnode["kind"] == "ParmVarDecl"
+        ]
+        # for support variable argument
+        if args_t.endswith("..."):
+            arguments.append((None, "..."))
+        # sanity check
+        if args_t != ", ".join(t for _, t in arguments):
+            warnings.warn(
+                f"invalid sanity: id `{node['id']}`, named `{node['name']}`"
+                f" , originally `{args_t}`, but got `{arguments}`"
             )
-            if gadget.signature() not in gadgets:
-                gadgets[gadget.signature()] = gadget
-        return list(gadgets.values())
+            return None
+        return CStyleAPIGadget(
+            name=node["name"],
+            return_type=return_t,
+            arguments=arguments,
+            _meta={"_post_qualifier": _post_qualifier},
+        )
 
     def extract_critical_path(
         self,
@@ -191,57 +572,131 @@ class ClangASTParser(ASTParser):
         """
         # extract the control flow graph
         extracted = self._extract_cfg(source, target=target)
-        meta = extracted.pop("__meta__", {})
-        (cfg,) = extracted.values()
+        # do not pop the metadata, the extracted graph is cached
+        meta = extracted.get("__meta__", {})
+        (cfg,) = (graph for name, graph in extracted.items() if name != "__meta__")
         # placeholder
-        gadget = None
-        # construct the graph
-        _call_stmt = re.compile(r"^(%\d+\s*=\s*)*call.+?@(.+?)\(.+$")
-        nodes = {
-            obj["_gvid"]: {
-                "body": [
-                    (gadget or found, lineno)
-                    # parse the IRs
-                    for ir, lineno in self._parse_dot_body(obj["label"], meta=meta)
-                    for _, found in _call_stmt.findall(ir)
-                    # name matching for C/C++ (exact or mangled)
-                    if gadgets is None
-                    or (gadget := self._find_gadget(found, gadgets or []))
-                ],
-                "next": [],
-            }
-            for obj in cfg["objects"]
-        }
-        for edge in cfg.get("edges", []):
-            nodes[edge["tail"]]["next"].append(edge["head"])
-        # find the path of the maximum length
-        stack = [([0], nodes[0]["body"])]
-        maxlen, maxapis = 0, []
-        while stack:
-            path, apis = stack.pop()
-            *_, last = path
-            # if end-of-code
-            if not nodes[last]["next"]:
-                # max length check
-                if len(apis) > maxlen:
-                    maxapis, maxlen = [apis], len(apis)
-                elif len(apis) == maxlen:
-                    maxapis.append(apis)
-                continue
-            # append without cycle
-            stack.extend(
+        gadget, gadget_map = None, {g.name: g for g in gadgets or []}
+        # memoize the lookups, since the same symbol is called across the blocks
+        _found = {}
+
+        def _lookup(found: str) -> CStyleAPIGadget | None:
+            if found not in _found:
+                _found[found] = self._find_gadget(found, gadget_map)
+            return _found[found]
+
+        # flatten the graph into the parallel arrays, indexed by the block order
+        index = {obj["_gvid"]: v for v, obj in enumerate(cfg["objects"])}
+        # parse the call sites once per extracted graph, independent of the gadgets
+        if "_calls" not in meta:
+            meta["_calls"] = [
                 [
-                    (path + [i], apis + nodes[i]["body"])
-                    for i in nodes[last]["next"]
-                    if i not in path
+                    (found, lineno)
+                    for ir, lineno in self._parse_dot_body(obj["label"], meta=meta)
+                    for _, found in _CALL_STMT.findall(ir)
                 ]
+                for obj in cfg["objects"]
+            ]
+        bodies, body_off = [], [0]
+        for calls in meta["_calls"]:
+            bodies.extend(
+                (gadget or found, lineno)
+                for found, lineno in calls
+                # name matching for C/C++ (exact or mangled)
+                if gadgets is None or (gadget := _lookup(found))
             )
-        # minimize
-        minimized = []
-        for apis in maxapis:
-            if apis not in minimized:
-                minimized.append(apis)
-        return minimized
+            body_off.append(len(bodies))
+        heads = [[] for _ in index]
+        for edge in cfg.get("edges", []):
+            heads[index[edge["tail"]]].append(index[edge["head"]])
+        # thread the jumps over the empty blocks with a single successor
+        entry, threaded = index[0], {}
+
+        def _thread(v: int) -> int:
+            visited = []
+            while v != entry and body_off[v] == body_off[v + 1] and len(heads[v]) == 1:
+                if v in threaded:
+                    v = threaded[v]
+                    break
+                if v in visited:
+                    # cycle of the empty blocks, leave as it is
+                    v = visited[0]
+                    break
+                visited.append(v)
+                v = heads[v][0]
+            threaded.update((u, v) for u in visited)
+            return v
+
+        # successors in the compressed sparse row format
+        succ, succ_off = [], [0]
+        for head in heads:
+            succ.extend(_thread(v) for v in head)
+            succ_off.append(len(succ))
+        # find the distinct API sequences of the maximum length
+        return self._longest_paths(bodies, body_off, succ, succ_off, entry)
+
+    def _longest_paths(
+        self,
+        bodies: list[tuple[str | CStyleAPIGadget, int | None]],
+        body_off: list[int],
+        succ: list[int],
+        succ_off: list[int],
+        entry: int = 0,
+    ) -> list[list[tuple[str | CStyleAPIGadget, int | None]]]:
+        """Find the API sequences of the longest paths from the entry to the exit blocks.
+        Back edges are removed w.r.t. the depth-first search from the entry,
+        then the longest paths are found by dynamic programming in topological order.
+        It is equivalent to the search over all simple paths for the reducible CFGs.
+        Args:
+            bodies: the APIs of the blocks, flattened in order of the blocks.
+            body_off: the offsets of the APIs of the block `v`, `bodies[body_off[v]:body_off[v + 1]]`.
+            succ: the successors of the blocks, flattened in order of the blocks.
+            succ_off: the offsets of the successors of the block `v`, `succ[succ_off[v]:succ_off[v + 1]]`.
+            entry: the index of the entry block.
+        Returns:
+            distinct API sequences of the longest paths.
+        """
+        order, back, best = _longest_lengths(body_off, succ, succ_off, entry)
+        if best[entry] < 0:
+            return []
+        # hash-consed API sequences, `cells[i] = (api, index of the tail)`, -1 for empty
+        cells, interned = [], {}
+
+        def _cons(body: list, tail: int) -> int:
+            for api, lineno in reversed(body):
+                key = (api if isinstance(api, str) else id(api), lineno, tail)
+                if key not in interned:
+                    interned[key] = len(cells)
+                    cells.append(((api, lineno), tail))
+                tail = interned[key]
+            return tail
+
+        # reconstruct the distinct API sequences in post-order
+        paths = {}
+        for node in order:
+            if best[node] < 0:
+                continue
+            body = bodies[body_off[node] : body_off[node + 1]]
+            if succ_off[node] == succ_off[node + 1]:
+                paths[node] = [_cons(body, -1)]
+                continue
+            # successors on the longest paths, equal sequences share the same cell
+            rest, dedup = best[node] - len(body), {}
+            for e in range(succ_off[node], succ_off[node + 1]):
+                if back[e] or best[succ[e]] != rest:
+                    continue
+                for tail in paths[succ[e]]:
+                    dedup.setdefault(_cons(body, tail), None)
+            paths[node] = list(dedup)
+        # materialize
+        materialized = []
+        for i in paths[entry]:
+            apis = []
+            while i >= 0:
+                api, i = cells[i]
+                apis.append(api)
+            materialized.append(apis)
+        return materialized
 
     def _parse_dot_body(
         self, body: str, meta: dict | None = None
@@ -253,27 +708,33 @@ class ClangASTParser(ASTParser):
         Returns:
             a list of the LLVM IRs and their line numbers.
         """
-        inner = re.findall(r"^\{(.+?)\}$", body)
+        inner = _DOT_BODY_INNER.findall(body)
         if not inner:
             return None
         (body,) = inner
-        _debugs, _sources = meta.get("debugs", {}), meta.get("source", "").split("\n")
+        _debugs = meta.get("debugs", {})
+        # index the original IRs once per metadata
+        if "_index" not in meta:
+            meta["_sources"] = meta.get("source", "").split("\n")
+            meta["_index"] = set(meta["_sources"])
+        _sources, _index = meta["_sources"], meta["_index"]
         # start to parse
         result = []
         for ir in body.strip("\\l").split("\\l"):
             if ir.startswith("|"):
                 ir = ir[1:]
-            # find to find the originals
-            try:
-                ir = next(i for i in _sources if i.startswith(ir))
-            except:
-                pass
-            if not (dbgs := re.findall(r"!dbg !(\d+)", ir)):
+            # find to find the originals, scan only if the label is truncated
+            if ir not in _index:
+                try:
+                    ir = next(i for i in _sources if i.startswith(ir))
+                except:
+                    pass
+            if not (dbgs := _DEBUG_REF.findall(ir)):
                 result.append((ir.strip(), None))
                 continue
             # parsed debug information
             (dbg,) = dbgs
-            if not (linenos := re.findall(r"line: (\d+)", _debugs.get(int(dbg), ""))):
+            if not (linenos := _DEBUG_LINE.findall(_debugs.get(int(dbg), ""))):
                 result.append((ir.strip(), None))
                 continue
             (lineno,) = linenos
@@ -284,7 +745,7 @@ class ClangASTParser(ASTParser):
         self,
         name: str,
         gadgets: list[CStyleAPIGadget] | dict[str, CStyleAPIGadget],
-        mangled: Callable[[str], re.Pattern] = lambda i: re.compile(f"^_Z.*\\d+{i}"),
+        mangled: Callable[[str], re.Pattern] = _mangled,
     ) -> CStyleAPIGadget | None:
         """Find the gadget w.r.t. the given name.
         Args:
@@ -298,7 +759,11 @@ class ClangASTParser(ASTParser):
             gadgets = {g.name: g for g in gadgets}
         if name in gadgets:
             return gadgets[name]
+        if not name.startswith("_Z"):
+            return None
         # if name is mangled
+        if (unmangled := _unmangled_name(name)) in gadgets:
+            return gadgets[unmangled]
         for gadget in gadgets.values():
             if mangled(gadget.name).findall(name):
                 return gadget
@@ -311,20 +776,14 @@ class ClangASTParser(ASTParser):
         Returns:
             list of tuples about start and end index of the inner parenthesis.
         """
-        parsed, stack, idx = [], [0], 0
-        while idx < len(item):
-            s = item[idx:].find("(")
-            e = item[idx:].find(")")
-            if s == -1 and e == -1:
-                break
-            if e == -1 or (s >= 0 and s < e):
-                idx += s + 1
-                stack.append(idx)
-                continue
+        parsed, stack = [], [0]
+        # single pass over the parenthesis
+        for found in _PARENTHESIS.finditer(item):
+            idx = found.start()
+            if found.group() == "(":
+                stack.append(idx + 1)
             else:
-                idx += e + 1
-                parsed.append((stack.pop(), idx - 1))
-                continue
+                parsed.append((stack.pop(), idx))
 
         if len(stack) > 1:
             raise ValueError("unpaired parenthesis")
@@ -339,20 +798,87 @@ class ClangASTParser(ASTParser):
         Returns:
             parsed abstract syntax tree.
         """
-        with open(source) as f:
-            code = f.read()
-        _key = (source, code)
+        _key = self._ast_cache_key(source)
         if _key in self._ast_caches:
+            self._ast_caches.move_to_end(_key)
             return self._ast_caches[_key]
-        # dump the ast
-        dumped = self._run_ast_dump(source, self.clang, self.include_dir)
-        if len(self._ast_caches) > self._max_cache:
-            # FIFO
-            self._ast_caches = dict(list(self._ast_caches.items())[1:])
-        # update
-        self._ast_caches[_key] = dumped
+        # load from the persistent cache
+        _filename = self._cache_file(source, "ast.json", self._libclang)
+        dumped = self._read_cache(_filename)
+        if dumped is None:
+            # stat the dependencies ahead, the headers could be modified while dumping
+            deps = self._dependencies(source)
+            # dump the ast
+            if self._libclang:
+                dumped = self._run_libclang_dump(source, self.include_dir)
+            else:
+                dumped = self._run_ast_dump(source, self.clang, self.include_dir)
+            if "error" not in dumped:
+                self._write_cache(_filename, dumped, deps)
+        self._update_cache(self._ast_caches, _key, dumped)
         return dumped
 
+    def _ast_cache_key(self, source: str) -> tuple:
+        """Compute the key of the in-memory ast cache.
+        Args:
+            source: a path to the target source file.
+        Returns:
+            the key of in-memory cache, the path, the modification time and the size of the file.
+        """
+        stat = os.stat(source)
+        return source, stat.st_mtime_ns, stat.st_size
+
+    def _cache_file(self, source: str, ext: str, *args) -> str | None:
+        """Compute the filename of the persistent cache.
+        Args:
+            source: a path to the target source file.
+            ext: the extension of the cache file, e.g. `ast.json`.
+            args: additional components of the key.
+        Returns:
+            the filename of the persistent cache, None if the cache is disabled.
+        """
+        if self._cache_dir is None:
+            return None
+        with open(source) as f:
+            code = f.read()
+        # the dump locates the declarations by the path of the source
+        _path = os.path.abspath(source)
+        return f"{self._hash_key(code, _path, *args)}.{ext}"
+
+    def _dependencies(self, source: str) -> dict[str, tuple[int, int]] | None:
+        """Collect the files the source depends on, the source itself and the included headers.
+        Args:
+            source: a path to the target source file.
+        Returns:
+            {PATH: (MODIFICATION_TIME, SIZE)}, None if the persistent cache is disabled or failed to preprocess the source.
+        """
+        # only for validating the persistent cache
+        if self._cache_dir is None:
+            return None
+        _key = self._ast_cache_key(source)
+        if _key in self._deps_caches:
+            self._deps_caches.move_to_end(_key)
+            return self._deps_caches[_key]
+        _include = [cmdarg for path in self.include_dir for cmdarg in ("-I", path)]
+        deps = _dependencies([self.clang, "-w", *_include, source])
+        self._update_cache(self._deps_caches, _key, deps)
+        return deps
+
+    def _update_cache(
+        self, caches: collections.OrderedDict, key: tuple, dumped: dict | tuple
+    ):
+        """Update the in-memory cache.
+        Args:
+            caches: the target cache, e.g. `self._ast_caches`, `self._cfg_caches` or `self._gadget_caches`.
+            key: the key of the cache.
+            dumped: the dumped object.
+        """
+        if len(caches) >= self._max_cache:
+            # evict the least recently used one
+            caches.popitem(last=False)
+        # update
+        caches[key] = dumped
+
     def _extract_cfg(
         self, source: str, target: str | None = "LLVMFuzzerTestOneInput"
     ) -> dict[str, dict]:
@@ -363,20 +889,96 @@ class ClangASTParser(ASTParser):
         Returns:
             extracted control-flow graph.
         """
-        with open(source) as f:
-            code = f.read()
-        _key = (source, code, target)
+        _key = (*self._ast_cache_key(source), target)
         if _key in self._cfg_caches:
+            self._cfg_caches.move_to_end(_key)
             return self._cfg_caches[_key]
-        # extract cfg
-        extracted = self._run_cfg_dump(source, self.include_dir, self.clang, target)
-        if len(self._cfg_caches) > self._max_cache:
-            # FIFO
-            self._cfg_caches = dict(list(self._cfg_caches.items())[1:])
-        # update
-        self._cfg_caches[_key] = extracted
+        # load from the persistent cache
+        _filename = self._cache_file(source, "cfg.pkl", target)
+        extracted = self._read_cache(_filename)
+        if extracted is None:
+            deps = self._dependencies(source)
+            # extract cfg
+            extracted = self._run_cfg_dump(source, self.include_dir, self.clang, target)
+            if "error" not in extracted:
+                self._write_cache(_filename, extracted, deps)
+        self._update_cache(self._cfg_caches, _key, extracted)
         return extracted
 
+    def _hash_key(self, code: str, *args) -> str:
+        """Compute the key of the persistent cache.
+        Args:
+            code: the source code.
+            args: additional components of the key, e.g. the path of the source, target function name.
+        Returns:
+            hexadecimal digest of the source code, include flags and clang version.
+        """
+        if self._clang_version is None:
+            proc = subprocess.run([self.clang, "--version"], capture_output=True)
+            self._clang_version = proc.stdout.decode("utf-8")
+        hasher = hashlib.blake2b(code.encode("utf-8"))
+        hasher.update(repr(self.include_dir).encode("utf-8"))
+        hasher.update(self._clang_version.encode("utf-8"))
+        hasher.update(repr(args).encode("utf-8"))
+        return hasher.hexdigest()
+
+    def _read_cache(self, filename: str | None) -> dict | None:
+        """Read the dumped object from the persistent cache.
+        Args:
+            filename: the name of the cache file, json-format if it ends with `.json`, otherwise pickle,
+                None if the cache is disabled.
+        Returns:
+            loaded object, None if the cache is disabled, missed or any of its dependencies is modified.
+        """
+        if self._cache_dir is None or filename is None:
+            return None
+        path = os.path.join(self._cache_dir, filename)
+        if not os.path.exists(path):
+            return None
+        try:
+            # written along with the dependencies, `{filename}.deps`
+            with open(f"{path}.deps", "rb") as f:
+                if _modified(_json_load(f)):
+                    return None
+            with open(path, "rb") as f:
+                if filename.endswith(".json"):
+                    return _json_load(f)
+                return pickle.load(f)
+        except Exception:
+            # broken cache
+            return None
+
+    def _write_cache(
+        self,
+        filename: str | None,
+        obj: dict | tuple,
+        deps: dict[str, tuple[int, int]] | None,
+    ):
+        """Write the object to the persistent cache atomically.
+        Args:
+            filename: the name of the cache file, json-format if it ends with `.json`, otherwise pickle.
+            obj: the object to write.
+            deps: the files the object depends on, written to `{filename}.deps` and validated on read,
+                skip writing if it is None since the object could not be validated.
+        """
+        if self._cache_dir is None or deps is None:
+            return
+        os.makedirs(self._cache_dir, exist_ok=True)
+        # the dependencies first, the object should not be visible without them
+        for name, item in [(f"{filename}.deps", deps), (filename, obj)]:
+            fd, temp = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    if name.endswith((".json", ".deps")):
+                        f.write(_json_dumps(item))
+                    else:
+                        pickle.dump(item, f)
+                os.replace(temp, os.path.join(self._cache_dir, name))
+            except Exception:
+                if os.path.exists(temp):
+                    os.remove(temp)
+                return
+
     @classmethod
     def _run_ast_dump(
         cls, source: str, clang: str = "clang++", include_dir: list[str] = []
@@ -391,26 +993,232 @@ class ClangASTParser(ASTParser):
         """
         _include = [cmdarg for path in include_dir for cmdarg in ("-I", path)]
 
-        proc = subprocess.run(
-            [
-                clang,
-                "-fsyntax-only",
-                "-Xclang",
-                "-ast-dump=json",
-                *_include,
-                source,
-            ],
-            capture_output=True,
-        )
-        ast = proc.stdout.decode("utf-8")
+        # redirect to the file for preventing the copies of the large dump
+        with tempfile.TemporaryFile() as f:
+            subprocess.run(
+                [
+                    clang,
+                    "-fsyntax-only",
+                    "-Xclang",
+                    "-ast-dump=json",
+                    # skip the warnings and the colored diagnostics
+                    "-w",
+                    "-fno-color-diagnostics",
+                    *_include,
+                    source,
+                ],
+                stdout=f,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                return _json_load(f)
+            except Exception as e:
+                f.seek(0)
+                return {
+                    "error": e,
+                    "_traceback": traceback.format_exc(),
+                    "_stdout": f.read().decode("utf-8", errors="replace"),
+                }
+
+    @classmethod
+    def _run_libclang_dump(cls, source: str, include_dir: list[str] = []) -> dict:
+        """Parse the source code with in-process libclang.
+        Args:
+            source: a path to the target source file.
+            include_dir: a list of paths to the directories for `#include` preprocessor.
+        Returns:
+            abstract syntax tree, in the same structure with the json-format clang ast dump.
+                only the fields required by the gadget parsers are filled.
+        """
+        global _LIBCLANG_INDEX
+        if _LIBCLANG_INDEX is None:
+            _LIBCLANG_INDEX = cindex.Index.create()
+        _include = [cmdarg for path in include_dir for cmdarg in ("-I", path)]
         try:
-            return json.loads(ast)
+            tu = _LIBCLANG_INDEX.parse(source, args=["-x", "c++", *_include])
         except Exception as e:
-            return {
-                "error": e,
-                "_traceback": traceback.format_exc(),
-                "_stdout": ast,
-            }
+            return {"error": e, "_traceback": traceback.format_exc()}
+        return cls._convert_cursor(tu.cursor)
+
+    @classmethod
+    def _convert_cursor(cls, cursor: "cindex.Cursor") -> dict:
+        """Convert the libclang cursor into the json-format clang ast tree.
+        Args:
+            cursor: the libclang cursor.
+        Returns:
+            converted tree.
+        """
+        root = cls._convert_node(cursor)
+        # explicit stack, preorder to keep the order of the children
+        stack = [(child, root) for child in reversed(list(cursor.get_children()))]
+        while stack:
+            cursor, parent = stack.pop()
+            node = cls._convert_node(cursor)
+            parent.setdefault("inner", []).append(node)
+            stack.extend(
+                (child, node) for child in reversed(list(cursor.get_children()))
+            )
+        if root["kind"] == "TranslationUnitDecl":
+            root.setdefault("inner", [])
+        return root
+
+    @classmethod
+    def _convert_node(cls, cursor: "cindex.Cursor") -> dict:
+        """Convert the libclang cursor into the json-format clang ast node, without children.
+        Args:
+            cursor: the libclang cursor.
+        Returns:
+            converted node.
+        """
+        _kind = cursor.kind
+        _kinds = cindex.CursorKind
+        node = {"id": hex(cursor.hash), "kind": _kind.name}
+        match _kind:
+            case _kinds.TRANSLATION_UNIT:
+                node["kind"] = "TranslationUnitDecl"
+            case _kinds.TYPE_ALIAS_DECL | _kinds.TYPEDEF_DECL:
+                node["kind"] = (
+                    "TypeAliasDecl"
+                    if _kind == _kinds.TYPE_ALIAS_DECL
+                    else "TypedefDecl"
+                )
+                node["type"] = {"qualType": cursor.underlying_typedef_type.spelling}
+            case _kinds.STRUCT_DECL | _kinds.CLASS_DECL | _kinds.UNION_DECL:
+                node["kind"] = "CXXRecordDecl"
+                node["tagUsed"] = _kind.name[: -len("_DECL")].lower()
+            case _kinds.FUNCTION_DECL | _kinds.PARM_DECL:
+                node["kind"] = (
+                    "FunctionDecl" if _kind == _kinds.FUNCTION_DECL else "ParmVarDecl"
+                )
+                node["type"] = {"qualType": cursor.type.spelling}
+        if cursor.spelling and not cursor.is_anonymous():
+            node["name"] = cursor.spelling
+        if _kind != _kinds.TRANSLATION_UNIT:
+            file = cursor.location.file
+            node["loc"] = {} if file is None else {"file": file.name}
+        return node
+
+    @classmethod
+    def _parse_dot_file(cls, path: str) -> dict[str, list[dict]]:
+        """Parse the graphviz dot-file written by `opt -dot-cfg`.
+        Args:
+            path: a path to the dot-file.
+        Returns:
+            the graph in the structure of `dot -Txdot_json`, only with the `_gvid` and `label` of the objects,
+                and the `tail` and `head` of the edges.
+        """
+        # graphviz assigns the ids in order of the first appearance
+        ids, labels, edges = {}, {}, []
+        with open(path) as f:
+            for line in f:
+                if edge := _DOT_EDGE.match(line):
+                    tail = ids.setdefault(edge.group(1), len(ids))
+                    head = ids.setdefault(edge.group(2), len(ids))
+                    edges.append({"tail": tail, "head": head})
+                elif node := _DOT_NODE.match(line):
+                    id_ = ids.setdefault(node.group(1), len(ids))
+                    labels[id_] = node.group(2).replace('\\"', '"')
+        return {
+            "objects": [
+                {"_gvid": id_, "label": labels.get(id_, "\\N")} for id_ in ids.values()
+            ],
+            "edges": edges,
+        }
+
+    @classmethod
+    def _parse_ir_cfg(cls, ll: str, target: str | None = None) -> dict[str, dict]:
+        """Extract the control-flow graphs from the LLVM IR without `opt -dot-cfg`.
+        Args:
+            ll: the textual LLVM IR.
+            target: specify a function target or extract from all functions.
+        Returns:
+            the graphs in the structure of `_parse_dot_file`, the labels are rendered
+                in the dot-record format `{block:\\l IR\\l ...}` with the original IRs.
+        """
+        cfgs, fn, blocks = {}, None, []
+        for line in ll.split("\n"):
+            if fn is None:
+                if (found := _IR_DEFINE.match(line)) and (
+                    target is None or found.group(1).strip('"') == target
+                ):
+                    # the entry block may not be labeled
+                    fn, blocks = found.group(1).strip('"'), [("", [])]
+                continue
+            if line.startswith("}"):
+                ids = {name: i for i, (name, _) in enumerate(blocks)}
+                cfgs[fn] = {
+                    "objects": [
+                        {
+                            "_gvid": i,
+                            "label": "{" + "\\l".join([f"{name}:", *irs]) + "\\l}",
+                        }
+                        for i, (name, irs) in enumerate(blocks)
+                    ],
+                    "edges": [
+                        {"tail": i, "head": ids[succ]}
+                        for i, (_, irs) in enumerate(blocks)
+                        for ir in irs
+                        for succ in _IR_SUCCESSOR.findall(ir)
+                        if succ in ids
+                    ],
+                }
+                fn = None
+            elif found := _IR_LABEL.match(line):
+                if blocks[-1][0] or blocks[-1][1]:
+                    blocks.append((found.group(1), []))
+                else:
+                    # labeled entry block
+                    blocks[-1] = (found.group(1), [])
+            elif line.strip() and not line.lstrip().startswith(";"):
+                blocks[-1][1].append(line)
+        return cfgs
+
+    @classmethod
+    def _run_opt_dot_cfg(
+        cls, ir: str, workdir: str, target: str | None, log: TextIO
+    ) -> dict[str, dict]:
+        """Run the `opt -dot-cfg` for extracting the control-flow graphs.
+        Args:
+            ir: a path to the LLVM IR file.
+            workdir: a path to the directory for writing the dot-files.
+            target: specify a function target or generate all.
+            log: a file for logging the outputs of the opt.
+        Returns:
+            the graphs parsed by `_parse_dot_file`.
+        """
+        try:
+            # Mac OS LLVM Supports (tested on LLVM 18.1.8, arm64-apple-darwin23.5.0)
+            _cmd = ["opt", ir, "-p", "dot-cfg"]
+            if target:
+                _cmd.append(f"-cfg-func-name={target}")
+            subprocess.run(
+                _cmd,
+                cwd=workdir,
+                check=True,
+                stdout=log,
+                stderr=log,
+                close_fds=False,
+            )
+        except subprocess.CalledProcessError:
+            # Ubuntu LLVM Supports (tested on 15.0.7, x86_64-pc-linux-gnu)
+            _cmd = ["opt", ir, "--dot-cfg"]
+            if target:
+                _cmd.append(f"-cfg-func-name={target}")
+            subprocess.run(
+                _cmd,
+                cwd=workdir,
+                check=True,
+                stdout=log,
+                stderr=log,
+                close_fds=False,
+            )
+        return {
+            filename[1 : -len(".dot")]: cls._parse_dot_file(
+                os.path.join(workdir, filename)
+            )
+            for filename in os.listdir(workdir)
+            if filename.startswith(".") and filename.endswith(".dot")
+        }
 
     @classmethod
     def _run_cfg_dump(
@@ -446,6 +1254,8 @@ class ClangASTParser(ASTParser):
                         "-O0",
                         "-Xclang",
                         "-disable-O0-optnone",
+                        "-w",
+                        "-fno-color-diagnostics",
                         "-emit-llvm",
                         source,
                         "-o",
@@ -455,48 +1265,13 @@ class ClangASTParser(ASTParser):
                     subprocess.run(
                         _cmd, check=True, stdout=f, stderr=f, close_fds=False
                     )
-                    # extract the control-flow graph from the IR
-                    try:
-                        # Mac OS LLVM Supports (tested on LLVM 18.1.8, arm64-apple-darwin23.5.0)
-                        _cmd = ["opt", ir, "-p", "dot-cfg"]
-                        if target:
-                            _cmd.append(f"-cfg-func-name={target}")
-                        subprocess.run(
-                            _cmd,
-                            cwd=_temp,
-                            check=True,
-                            stdout=f,
-                            stderr=f,
-                            close_fds=False,
-                        )
-                    except subprocess.CalledProcessError:
-                        # Ubuntu LLVM Supports (tested on 15.0.7, x86_64-pc-linux-gnu)
-                        _cmd = ["opt", ir, "--dot-cfg"]
-                        if target:
-                            _cmd.append(f"-cfg-func-name={target}")
-                        subprocess.run(
-                            _cmd,
-                            cwd=_temp,
-                            check=True,
-                            stdout=f,
-                            stderr=f,
-                            close_fds=False,
-                        )
-
-                    files = [
-                        os.path.join(_temp, filename)
-                        for filename in os.listdir(_temp)
-                        if filename.startswith(".") and filename.endswith(".dot")
-                    ]
-                    # serialize it into a json
-                    for path in files:
-                        subprocess.run(
-                            ["dot", "-Txdot_json", path, "-o", f"{path}.json"],
-                            check=True,
-                            stdout=f,
-                            stderr=f,
-                            close_fds=False,
-                        )
+                    with open(ir) as _f:
+                        ll = _f.read()
+                    # extract the control-flow graph from the IR directly
+                    cfgs = cls._parse_ir_cfg(ll, target)
+                    if not cfgs:
+                        # fallback to the opt
+                        cfgs = cls._run_opt_dot_cfg(ir, _temp, target, f)
             except subprocess.CalledProcessError as e:
                 with open(log) as f:
                     return {
@@ -504,22 +1279,11 @@ class ClangASTParser(ASTParser):
                         "_traceback": traceback.format_exc(),
                         "_log": f.read(),
                     }
-            # load json
-            cfgs = {}
-            for path in files:
-                with open(f"{path}.json") as f:
-                    loaded = json.load(f)
-                cfgs[os.path.basename(path)[1 : -len(".dot.json")]] = loaded
-            # metadata
-            with open(ir) as f:
-                ll = f.read()
-                cfgs["__meta__"] = {
-                    "source": ll,
-                    "debugs": {
-                        int(found[0]): line
-                        for line in ll.split("\n")
-                        if (found := re.findall(r"^!(\d+)", line))
-                    },
-                }
+            # metadata, debug metadata are placed at the end of the module
+            debugs, start = {}, ll.find("\n!")
+            for line in ll[start + 1 :].split("\n") if start >= 0 else []:
+                if line.startswith("!") and (found := _DEBUG_META.match(line)):
+                    debugs[int(found.group(1))] = line
+            cfgs["__meta__"] = {"source": ll, "debugs": debugs}
 
         return cfgs
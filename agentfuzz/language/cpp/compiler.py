@@ -1,7 +1,13 @@
+import glob
+import hashlib
 import os
+import shutil
 import subprocess
+import tempfile
+import threading
 
 from agentfuzz.analyzer import Compiler
+from agentfuzz.language.cpp.ast import _dependencies, _modified
 from agentfuzz.language.cpp.fuzzer import LibFuzzer
 
 
@@ -16,6 +22,23 @@ _CXXFLAGS = [
     "-fcoverage-mapping",  # coverage supports
 ]
 
+# extensions of the source files compiled as C++ regardless of the driver
+_CXX_EXTS = (".cc", ".cpp", ".cxx", ".c++", ".C")
+
+# compiler cache launchers, use the first one found in PATH
+_LAUNCHERS = ["ccache", "sccache"]
+
+
+def _find_launcher() -> str | None:
+    """Find the compiler cache launcher available in PATH.
+    Returns:
+        a path to the launcher, none if there is no launcher installed.
+    """
+    for launcher in _LAUNCHERS:
+        if path := shutil.which(launcher):
+            return path
+    return None
+
 
 class Clang(Compiler):
     """Compile the C/C++ project with clang w/libfuzzer."""
@@ -27,6 +50,7 @@ class Clang(Compiler):
         include_dir: list[str] = [],
         clang: str = "clang++",
         flags: list[str] = _CXXFLAGS,
+        _cache_dir: str | None = None,
     ):
         """Prepare for the compile.
         Args:
@@ -35,44 +59,234 @@ class Clang(Compiler):
             include_dir: a list of paths to the directory for preprocessing #include macro.
             clang: a path to the clang compiler.
             flags: additional compiler arguments.
+            _cache_dir: a path to the directory for the precompiled headers, disabled if it is not provided.
         """
         self.libpath = libpath
         self.links = links
         self.include_dir = include_dir
         self.clang = clang
         self.flags = flags
+        # resolve the compiler path once, the relative one forces fork+exec
+        self._executable = shutil.which(clang) or clang
+        # compiler cache for the repeated compilation of the similar harnesses
+        self._launcher = _find_launcher()
+        self._launcher_env = {
+            "CCACHE_SLOPPINESS": "pch_defines,time_macros",
+            **os.environ,
+        }
+        # static part of the command lines, reused across the compilations
+        self._include_args = [arg for path in include_dir for arg in ("-I", path)]
+        self._link_args = [libpath, *links]
+        # precompiled headers, {(HEADER_LANGUAGE, *HEADERS): (PATH, DEPENDENCIES) or None if failed}
+        self._cache_dir = _cache_dir
+        self._clang_version: str | None = None
+        self._pch: dict[tuple[str, ...], tuple[str, dict] | None] = {}
+        self._pch_lock = threading.Lock()
+        self._pch_locks: dict[tuple[str, ...], threading.Lock] = {}
 
     def compile(
         self,
         srcfile: str,
         _workdir: str | None = None,
         _outpath: str | None = None,
+        _headers: list[str] | None = None,
     ) -> LibFuzzer:
         """Compile the given harness to fuzzer object.
         Args:
             srcfile: a path to the source code file.
             _workdir: a path to the working directory, use `{os.path.splitext(srcfile)[0]}` if it is not provided
             _outpath: a path to the compiled binary, use `{_workdir}/{os.path.basename(srcfile)}.out` if it is not provided.
+            _headers: the leading `#include` operands of the source, e.g. `<stdint.h>`, precompiled if possible.
         Returns:
             fuzzer object.
         """
         if _workdir is None:
             _workdir = os.path.dirname(srcfile)
         os.makedirs(_workdir, exist_ok=True)
-        _include_args = [arg for path in self.include_dir for arg in ("-I", path)]
         executable = _outpath or f"{_workdir}/{os.path.basename(srcfile)}.out"
+        _pch_args = self._precompiled_header(srcfile, _headers)
+        try:
+            self._build(srcfile, executable, _pch_args)
+        except RuntimeError:
+            # the precompiled header only accelerates, never decides the result
+            if not _pch_args:
+                raise
+            self._build(srcfile, executable)
+
+        return LibFuzzer(executable, self.libpath, _workdir=_workdir)
+
+    def syntax_check(self, srcfile: str, _headers: list[str] | None = None):
+        """Check the given source only parses and type-checks, without code generation and linkage.
+        Args:
+            srcfile: a path to the source code file.
+            _headers: the leading `#include` operands of the source, e.g. `<stdint.h>`, precompiled if possible.
+        """
+        _pch_args = self._precompiled_header(srcfile, _headers)
+        args = ["-fsyntax-only", srcfile, *self._include_args]
+        try:
+            self._run([self._executable, *self.flags, *_pch_args, *args])
+        except RuntimeError:
+            if not _pch_args:
+                raise
+            self._run([self._executable, *self.flags, *args])
+
+    def _build(self, srcfile: str, executable: str, _pch_args: list[str] | None = None):
+        """Compile and link the given source.
+        Args:
+            srcfile: a path to the source code file.
+            executable: a path to the compiled binary.
+            _pch_args: compiler arguments to include the precompiled header.
+        """
+        _pch_args = _pch_args or []
+        if self._launcher is None:
+            self._run(
+                [
+                    self._executable,
+                    *self.flags,
+                    *_pch_args,
+                    srcfile,
+                    *self._include_args,
+                    "-o",  # specifying the output path
+                    executable,
+                    *self._link_args,  # linkage
+                ]
+            )
+        else:
+            # compile and link separately, the launchers do not cache the linking
+            _object = f"{executable}.o"
+            try:
+                self._run(
+                    [
+                        self._launcher,
+                        self._executable,
+                        *self.flags,
+                        *_pch_args,
+                        "-c",
+                        srcfile,
+                        *self._include_args,
+                        "-o",
+                        _object,
+                    ],
+                    env=self._launcher_env,
+                )
+                self._run(
+                    [
+                        self._executable,
+                        *self.flags,
+                        _object,
+                        "-o",
+                        executable,
+                        *self._link_args,
+                    ]
+                )
+            finally:
+                if os.path.exists(_object):
+                    os.remove(_object)
+
+    def _precompiled_header(
+        self, srcfile: str, headers: list[str] | None = None
+    ) -> list[str]:
+        """Prepare the precompiled header of the headers the source already includes.
+        Args:
+            srcfile: a path to the source code file.
+            headers: the leading `#include` operands of the source, e.g. `<stdint.h>` or `"foo.h"`.
+        Returns:
+            compiler arguments to include the precompiled header,
+                empty if it is disabled, failed to build or no headers are given.
+        """
+        if self._cache_dir is None or not headers:
+            return []
+        cxx = self.clang.endswith("++") or srcfile.endswith(_CXX_EXTS)
+        lang = "c++-header" if cxx else "c-header"
+        key = (lang, *headers)
+        # build once even if the harnesses are compiled concurrently
+        with self._pch_lock:
+            lock = self._pch_locks.setdefault(key, threading.Lock())
+        with lock:
+            # rebuild if any of the included files is modified, clang rejects the stale one
+            built = self._pch.get(key)
+            if key not in self._pch or (built is not None and _modified(built[1])):
+                self._pch[key] = self._build_pch(lang, headers)
+        if (built := self._pch[key]) is None:
+            return []
+        return ["-include-pch", built[0]]
+
+    def _build_pch(
+        self, lang: str, headers: list[str] | None = None
+    ) -> tuple[str, dict[str, tuple[int, int]]] | None:
+        """Build the precompiled header, reuse the previous one if the compiler, flags and included files are not changed.
+        Args:
+            lang: the language of the header, `c-header` or `c++-header`.
+            headers: the `#include` operands to precompile, e.g. `<stdint.h>` or `"foo.h"`.
+        Returns:
+            a path to the precompiled header and the files it depends on, None if failed to build.
+        """
+        headers = headers or []
+        if self._clang_version is None:
+            proc = subprocess.run([self.clang, "--version"], capture_output=True)
+            self._clang_version = proc.stdout.decode("utf-8")
+        hasher = hashlib.blake2b(self._clang_version.encode("utf-8"))
+        hasher.update(
+            repr((self.clang, self.flags, self.include_dir, lang, headers)).encode()
+        )
+        key = hasher.hexdigest()
+        header = os.path.join(self._cache_dir, f"{key}.h")
+        os.makedirs(self._cache_dir, exist_ok=True)
+        # the precompiled header validates its input file, keep it alongside
+        if not os.path.exists(header):
+            with open(header, "w") as f:
+                f.writelines(f"#include {name}\n" for name in headers)
+        # the included headers could be modified transitively, e.g. between the precheck runs
+        deps = _dependencies(
+            [self._executable, *self.flags, *self._include_args, "-x", lang, header]
+        )
+        if deps is None:
+            return None
+        stamp = hashlib.blake2b(repr(sorted(deps.items())).encode(), digest_size=16)
+        path = f"{header}.{stamp.hexdigest()}.pch"
+        if os.path.exists(path):
+            return path, deps
+        fd, temp = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            self._run(
+                [
+                    self._executable,
+                    *self.flags,
+                    *self._include_args,
+                    "-x",
+                    lang,
+                    header,
+                    "-o",
+                    temp,
+                ]
+            )
+            os.replace(temp, path)
+        except RuntimeError:
+            return None
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
+        # drop the stale ones built against the previous headers
+        for stale in glob.glob(f"{glob.escape(header)}.*.pch"):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+        return path, deps
+
+    def _run(self, args: list[str], env: dict[str, str] | None = None):
+        """Run the compiler.
+        Args:
+            args: the command line arguments.
+            env: environment variables, inherit the current process' if it is not provided.
+        """
         output = subprocess.run(
-            [
-                self.clang,
-                *self.flags,
-                srcfile,
-                *_include_args,
-                "-o",  # specifying the output path
-                executable,
-                self.libpath,  # linkage
-                *self.links,
-            ],
+            args,
             capture_output=True,
+            env=env,
+            close_fds=False,  # posix_spawn, fds of python are non-inheritable
         )
         try:
             output.check_returncode()
@@ -81,5 +295,3 @@ class Clang(Compiler):
             raise RuntimeError(
                 f"{self.clang} returned non-zero exit status:\n{stderr}"
             ) from e
-
-        return LibFuzzer(executable, self.libpath, _workdir=_workdir)
@@ -1,13 +1,221 @@
+import atexit
+import functools
+import hashlib
+import io
 import multiprocessing as mp
 import os
+import selectors
 import shutil
 import subprocess
 import tempfile
+import threading
+from multiprocessing.pool import Pool, ThreadPool
+from multiprocessing.sharedctypes import SynchronizedArray
 from time import time
 from typing import Iterator
 
+from tqdm.auto import tqdm
+
 from agentfuzz.analyzer import Coverage, Fuzzer
-from agentfuzz.language.cpp.lcov import parse_lcov
+from agentfuzz.language.cpp.lcov import parse_lcov_stream
+
+# minimum number of the corpora to run `-merge=1`
+_MIN_MERGE_THRESHOLD = 16
+# read buffer size of the `llvm-cov export` pipe, the report may be tens of megabytes
+_EXPORT_BUFSIZE = 1 << 20
+
+# persistent worker pools of the batch runs, {BATCH_SIZE: POOL}
+_POOLS: dict[int, Pool] = {}
+_POOL_LOCK = threading.Lock()
+# recycle the workers for bounding the memory growth
+_MAX_TASKS_PER_CHILD = 256
+# root of the working directories reused by the workers, {ROOT}/{PID}
+_WORKDIR_ROOT: str | None = None
+# cpu pinned to the worker, None if pinning is unsupported
+_CPU: int | None = None
+
+
+def _get_pool(processes: int) -> Pool:
+    """Get the persistent worker pool, create if it does not exist.
+    Args:
+        processes: the number of the worker processes.
+    Returns:
+        the worker pool.
+    """
+    with _POOL_LOCK:
+        if (pool := _POOLS.get(processes)) is None:
+            # a cpu slot per worker, owned by the pid of the worker
+            owners, cpus = None, []
+            if hasattr(os, "sched_getaffinity"):
+                owners = mp.Array("i", processes)
+                cpus = sorted(os.sched_getaffinity(0))
+            pool = mp.Pool(
+                processes,
+                initializer=_init_worker,
+                initargs=(owners, cpus),
+                maxtasksperchild=_MAX_TASKS_PER_CHILD,
+            )
+            _POOLS[processes] = pool
+    return pool
+
+
+def _init_worker(owners: SynchronizedArray | None, cpus: list[int]):
+    """Initialize the worker of the batch runs, claim the cpu slot of the exited worker.
+    Args:
+        owners: pids of the workers owning the cpu slots, 0 for the unclaimed, shared by the workers.
+        cpus: the available cpus.
+    """
+    global _CPU
+    if owners is None:
+        return
+    with owners.get_lock():
+        for i, pid in enumerate(owners):
+            # the pool reaps the recycled or crashed workers before replacing them
+            if pid == 0 or not _alive(pid):
+                owners[i] = os.getpid()
+                _CPU = cpus[i % len(cpus)]
+                return
+
+
+def _alive(pid: int) -> bool:
+    """Check whether the process is alive or not.
+    Args:
+        pid: the process id.
+    Returns:
+        True if the process exists.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _get_workdir_root() -> str:
+    """Get the root of the per-worker working directories, create if it does not exist.
+    Returns:
+        a path to the root directory.
+    """
+    global _WORKDIR_ROOT
+    with _POOL_LOCK:
+        if _WORKDIR_ROOT is None:
+            _WORKDIR_ROOT = tempfile.mkdtemp(prefix="agentfuzz-batch-")
+    return _WORKDIR_ROOT
+
+
+@atexit.register
+def _close_pools():
+    """Close the persistent worker pools and remove their working directories."""
+    global _WORKDIR_ROOT
+    with _POOL_LOCK:
+        # wait for the pending tasks, the workers still write to their directories
+        for pool in _POOLS.values():
+            pool.close()
+            pool.join()
+        _POOLS.clear()
+        if _WORKDIR_ROOT is not None:
+            shutil.rmtree(_WORKDIR_ROOT, ignore_errors=True)
+            _WORKDIR_ROOT = None
+
+
+def _clear_dir(path: str):
+    """Remove the contents of the directory, create if it does not exist.
+    Args:
+        path: a path to the directory.
+    """
+    if not os.path.isdir(path):
+        os.makedirs(path)
+        return
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+
+
+@functools.cache
+def _which(program: str) -> str:
+    """Resolve the path of the program once.
+    `subprocess` takes the `posix_spawn` fast path only for the executables with a directory component.
+    Args:
+        program: the name of the program, e.g. `llvm-cov`.
+    Returns:
+        a path to the program, or the given name if it is not found in PATH.
+    """
+    return shutil.which(program) or program
+
+
+def _replace_dir(src: str, dst: str):
+    """Replace the directory with renames, delete the old one in background.
+    Args:
+        src: a path to the new directory.
+        dst: a path to the directory to be replaced.
+    """
+    dst = os.path.abspath(dst)
+    trash = tempfile.mkdtemp(
+        prefix=f".{os.path.basename(dst)}.trash.", dir=os.path.dirname(dst)
+    )
+    try:
+        os.rename(dst, os.path.join(trash, "old"))
+    except OSError:
+        # fallback, remove in place
+        os.rmdir(trash)
+        shutil.rmtree(dst)
+        shutil.move(src, dst)
+        return
+    # `shutil.move` falls back to copy for the cross-device paths
+    shutil.move(src, dst)
+    # non-daemon, the interpreter waits for the deletion before exit
+    threading.Thread(
+        target=shutil.rmtree, args=(trash,), kwargs={"ignore_errors": True}
+    ).start()
+
+
+def _wait_exit(proc: subprocess.Popen, timeout: float | None) -> bool:
+    """Wait for the process to exit without reaping it.
+    `Popen.wait` with timeout polls `waitpid` with sleeps, pidfd wakes up on the exit instead.
+    Args:
+        proc: the target process.
+        timeout: the maximum waiting time in seconds, None for indefinitely wait.
+    Returns:
+        whether the process exited or not.
+    """
+    if proc.returncode is not None:
+        return True
+    if timeout is not None and hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(proc.pid)
+        except OSError:
+            # e.g. kernel < 5.3
+            fd = None
+        if fd is not None:
+            try:
+                with selectors.DefaultSelector() as sel:
+                    sel.register(fd, selectors.EVENT_READ)
+                    return len(sel.select(timeout)) > 0
+            finally:
+                os.close(fd)
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        return False
+    return True
+
+
+def _iter_corpus(corpus_dir: str) -> Iterator[tuple[str, int, int]]:
+    """Iterate the metadata of the corpora with a single directory scan.
+    Args:
+        corpus_dir: a path to the directory containing fuzzing inputs (corpus).
+    Returns:
+        the names, sizes and modification times of the corpora.
+    """
+    with os.scandir(corpus_dir) as it:
+        for entry in it:
+            stat = entry.stat(follow_symlinks=False)
+            yield entry.name, stat.st_size, stat.st_mtime_ns
 
 
 class LibFuzzer(Fuzzer):
@@ -18,6 +226,7 @@ class LibFuzzer(Fuzzer):
         path: str,
         libpath: str,
         minimize_corpus: bool = True,
+        jobs: int | None = None,
         _workdir: str | None = None,
     ):
         """Initialize the fuzzer wrapper.
@@ -25,12 +234,22 @@ class LibFuzzer(Fuzzer):
             path: a path to the executable file.
             libpath: a path to the library for tracking the coverage.
             minimize_corpus: minimize the corpus if given is True, using a `-merge=1` option.
+            jobs: the maximum number of the concurrent `-merge=1` processes, use `os.cpu_count()` if it is not provided.
             _workdir: a path to the working directory, use `{os.path.dirname(path)}` if it is not provided.
         """
         self.path = path
         self.libpath = libpath
         self.minimize_corpus = minimize_corpus
+        self.jobs = jobs
         self._workdir = _workdir or os.path.dirname(self.path)
+        # the digests of the corpus metadata, keyed by the minimized directory
+        self._minimized: dict[str, str] = {}
+        # the metadata of the raw profiles, keyed by the merged profile data
+        self._merges: dict[str, tuple] = {}
+        # the exported coverages and their sources' metadata, keyed by the export arguments
+        self._exports: dict[tuple, tuple[tuple, Coverage]] = {}
+        # environment variables of the fuzzer process, snapshot at the construction
+        self._env = {**os.environ, "LD_PRELOAD": self.libpath}
         # for supporting parallel run
         self._proc: subprocess.Popen | None = None
         self._timeout: float | None = None
@@ -43,33 +262,107 @@ class LibFuzzer(Fuzzer):
                 assume it as `os.path.join(self._workdir, f"{os.path.basename(corpus_dir)}_min)"` if it is not provided.
         Returns:
             a path to the directory where minimized corpus is written.
-                None if minimizing process is failed.
+                None if minimizing process is failed or skipped for the small corpus.
         """
         outdir = outdir or os.path.join(
             self._workdir, f"{os.path.basename(corpus_dir)}_min"
         )
+        # metadata of the corpus, without reading the contents
+        entries = sorted(_iter_corpus(corpus_dir))
+        if len(entries) < _MIN_MERGE_THRESHOLD:
+            return None
+        # reuse the minimized corpus if the corpus is unchanged
+        digest = hashlib.blake2b(repr(entries).encode("utf-8")).hexdigest()
+        if self._minimized.get(outdir) == digest and os.path.isdir(outdir):
+            return outdir
         os.makedirs(outdir, exist_ok=True)
         # specify artifact directory
         _artifact_dir = os.path.join(self._workdir, "artifact")
         os.makedirs(_artifact_dir, exist_ok=True)
-        with open(f"{self.path}.minimize.log", "wb") as f:
-            run = subprocess.run(
+        # split into the shards for the large corpus
+        jobs = min(
+            self.jobs or os.cpu_count() or 1, len(entries) // _MIN_MERGE_THRESHOLD
+        )
+        with tempfile.TemporaryDirectory(
+            dir=self._workdir, ignore_cleanup_errors=True
+        ) as _sharddir:
+            inputs = [corpus_dir]
+            if jobs > 1:
+                names = [name for name, *_ in entries]
+                inputs = self._minimize_shards(
+                    corpus_dir, names, jobs, _sharddir, _artifact_dir
+                )
+            # merge the reduced shards, only the survivors are executed again
+            with open(f"{self.path}.minimize.log", "wb") as f:
+                run = subprocess.run(
+                    [
+                        self.path,
+                        "-merge=1",
+                        outdir,
+                        *inputs,
+                        f"-artifact_prefix={_artifact_dir}/",
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=f,
+                    env=self._env,
+                    close_fds=False,  # posix_spawn, fds of python are non-inheritable
+                )
+        try:
+            run.check_returncode()
+        except subprocess.CalledProcessError:
+            return None
+        self._minimized[outdir] = digest
+        return outdir
+
+    def _minimize_shards(
+        self,
+        corpus_dir: str,
+        names: list[str],
+        jobs: int,
+        _sharddir: str,
+        _artifact_dir: str,
+    ) -> list[str]:
+        """Minimize the shards of the corpus concurrently.
+        Args:
+            corpus_dir: a path to the directory containing fuzzing inputs (corpus).
+            names: the filenames of the corpora.
+            jobs: the number of the shards.
+            _sharddir: a path to the directory to write the shards.
+            _artifact_dir: a path to the directory to write the artifacts.
+        Returns:
+            the paths to the minimized shards, or the unminimized one if failed.
+        """
+        procs = []
+        for i in range(jobs):
+            _in = os.path.join(_sharddir, f"in{i}")
+            _out = os.path.join(_sharddir, f"out{i}")
+            os.makedirs(_in)
+            os.makedirs(_out)
+            for name in names[i::jobs]:
+                src, dst = os.path.join(corpus_dir, name), os.path.join(_in, name)
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    # e.g. cross-device link
+                    shutil.copyfile(src, dst)
+            proc = subprocess.Popen(
                 [
                     self.path,
                     "-merge=1",
-                    outdir,
-                    corpus_dir,
+                    _out,
+                    _in,
                     f"-artifact_prefix={_artifact_dir}/",
                 ],
                 stdout=subprocess.DEVNULL,
-                stderr=f,
-                env={**os.environ, "LD_PRELOAD": self.libpath},
+                stderr=subprocess.DEVNULL,
+                env={
+                    **self._env,
+                    "LLVM_PROFILE_FILE": os.path.join(_sharddir, f"{i}.profraw"),
+                },
+                close_fds=False,
             )
-        try:
-            run.check_returncode()
-        except subprocess.CalledProcessError:
-            return None
-        return outdir
+            procs.append((proc, _in, _out))
+        return [_out if proc.wait() == 0 else _in for proc, _in, _out in procs]
 
     def run(
         self,
@@ -81,6 +374,7 @@ class LibFuzzer(Fuzzer):
         _profile: str | None = None,
         _logfile: str | None = None,
         _isolate_copurs_dir: bool = False,
+        _cpu: int | None = None,
     ) -> int | Exception | None:
         """Run the compiled harness with given corpus directory and the fuzzer dictionary.
         Args:
@@ -91,7 +385,9 @@ class LibFuzzer(Fuzzer):
             runs: the number of individual tests, None or -1 for indefinitely run.
             _profile: a path to the coverage profiling file, use `{self.path}.profraw` if it is not provided.
             _logfile: a path to the fuzzing log file, use `{self.path}.log` if it is not provided.
+                pass `os.devnull` to discard the log, e.g. if it is not tracked.
             _isolate_corpus_dir: whether isolate the corpus directory or not.
+            _cpu: a cpu index to pin the fuzzer process, unpinned if it is not provided.
         Returns:
             int: return code of the fuzzer process.
             None: if fuzzer process is running now.
@@ -111,12 +407,17 @@ class LibFuzzer(Fuzzer):
                     if _isolate_copurs_dir:
                         corpus_dir = minimized
                     else:
-                        shutil.rmtree(corpus_dir)
-                        shutil.move(minimized, corpus_dir)
+                        _replace_dir(minimized, corpus_dir)
             elif _isolate_copurs_dir:
                 # since libfuzzer generate the new corpus inplace the directory
                 _new_dir = os.path.join(self._workdir, "corpus")
-                shutil.copytree(corpus_dir, _new_dir)
+                try:
+                    # hardlink, libfuzzer does not modify the existing inputs
+                    shutil.copytree(corpus_dir, _new_dir, copy_function=os.link)
+                except (OSError, shutil.Error):
+                    # e.g. cross-device link
+                    shutil.rmtree(_new_dir, ignore_errors=True)
+                    shutil.copytree(corpus_dir, _new_dir)
                 corpus_dir = _new_dir
         # prepare the arguments
         _artifact_dir = os.path.join(self._workdir, "artifact")
@@ -132,26 +433,29 @@ class LibFuzzer(Fuzzer):
         _profile = _profile or f"{self.path}.profraw"
         if os.path.exists(_profile):
             os.remove(_profile)
-        # run the fuzzer
-        self._proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=open(_logfile or f"{self.path}.log", "wb"),
-            env={
-                **os.environ,
-                "LLVM_PROFILE_FILE": _profile,
-                "LD_PRELOAD": self.libpath,
-            },
-        )
+        # run the fuzzer, the child writes the log through its own descriptor
+        # so the handle of the parent could be closed right after the spawn
+        with open(_logfile or f"{self.path}.log", "wb") as stderr:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr,
+                env={**self._env, "LLVM_PROFILE_FILE": _profile},
+                close_fds=False,
+            )
+        # pin after the spawn, `preexec_fn` disables the posix_spawn path
+        if _cpu is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(self._proc.pid, {_cpu})
+            except OSError:
+                # e.g. the process already exited
+                pass
         if timeout is not None:
             self._timeout = time() + timeout
         if not wait_until_done:
             return None
         # wait until done
-        try:
-            self._proc.wait(timeout)
-        except subprocess.TimeoutExpired:
-            pass
+        _wait_exit(self._proc, timeout)
         # return code
         retn = self.poll()
         # hard clear (for preventing process miss-clear)
@@ -168,6 +472,7 @@ class LibFuzzer(Fuzzer):
         return_cov: bool = True,
     ) -> Iterator[tuple[str, int | Exception, tuple[Coverage, Coverage] | None]]:
         """Run the compiled harness in batch.
+        The generator should be fully consumed, the pending runs are waited for at the exit.
         Args:
             corpus_dirs: a list of corpus directories.
             batch_size: the desired concurrency level, maybe a size of the batch, or the number of the process.
@@ -180,15 +485,76 @@ class LibFuzzer(Fuzzer):
             int | Exception: the return code or the exceptions during run the fuzzer.
             tuple[Coverage, Coverage]: the coverage descriptors about library and fuzzer-itself.
         """
-        with mp.Pool(batch_size) as pool:
-            yield from pool.imap_unordered(
+        # pass the paths only, the fuzzer is reconstructed in the worker
+        _args = (self.path, self.libpath, self.minimize_corpus, _get_workdir_root())
+        yield from _get_pool(batch_size).imap_unordered(
+            _batch_run_proxy,
+            [
+                (*_args, corpus_dir, fuzzdict, timeout, runs, return_cov, None)
+                for corpus_dir in corpus_dirs
+            ],
+            chunksize=batch_size * 2,
+        )
+
+    def batch_coverage(
+        self,
+        corpus_dirs: list[str],
+        batch_size: int,
+        fuzzdict: str | None = None,
+        timeout: float | None = 300,
+        runs: int | None = None,
+        verbose: bool = False,
+    ) -> tuple[Coverage, Coverage, list[tuple[str, Exception]]]:
+        """Run the compiled harness in batch and accumulate the coverages of all runs.
+        Args:
+            corpus_dirs: a list of corpus directories.
+            batch_size: the desired concurrency level, maybe a size of the batch, or the number of the process.
+            fuzzdict: a path to the fuzzing dictionary file.
+            timeout: the maximum running time in seconds, None or indefinitely run.
+            runs: the number of individual tests, None for indefinitely run.
+            verbose: whether display the progress bar or not.
+        Returns:
+            Coverage: the accumulated coverage descriptors about library.
+            Coverage: the accumulated coverage descriptors about fuzzer-itself.
+            list[tuple[str, Exception]]: the failed corpus directories and their exceptions.
+        """
+        failures = []
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as _profdir:
+            # the profiling runtime merges the runs into the shared raw profiles
+            _args = (self.path, self.libpath, self.minimize_corpus, _get_workdir_root())
+            iter_ = _get_pool(batch_size).imap_unordered(
                 _batch_run_proxy,
                 [
-                    (self, corpus_dir, fuzzdict, timeout, runs, return_cov)
+                    (*_args, corpus_dir, fuzzdict, timeout, runs, False, _profdir)
                     for corpus_dir in corpus_dirs
                 ],
                 chunksize=batch_size * 2,
             )
+            if verbose:
+                iter_ = tqdm(iter_, total=len(corpus_dirs))
+            for corpus_dir, retn, _ in iter_:
+                if isinstance(retn, Exception):
+                    failures.append((corpus_dir, retn))
+            with os.scandir(_profdir) as it:
+                _profiles = [e.path for e in it if e.name.endswith(".profraw")]
+            if not _profiles:
+                return Coverage(), Coverage(), failures
+            # merge and export once for all runs
+            try:
+                _merged = self._merge_profile(
+                    _profiles, _merged=os.path.join(_profdir, "merged.profdata")
+                )
+                with ThreadPool(2) as pool:
+                    cov_lib, cov_fuzz = pool.starmap(
+                        lambda target, mode: self._export_coverage(
+                            target, _merged, mode
+                        ),
+                        [(self.libpath, "full"), (self.path, "lines")],
+                    )
+            except Exception as e:
+                failures.append((self.path, e))
+                return Coverage(), Coverage(), failures
+        return cov_lib, cov_fuzz, failures
 
     def poll(self) -> int | None | Exception:
         """Poll the return code of the fuzzer process and clear if process done.
@@ -199,8 +565,10 @@ class LibFuzzer(Fuzzer):
         """
         if self._proc is None:
             return RuntimeError("process is not running now")
-        # if the process is running and before timeout
-        if (retn := self._proc.poll()) is None and time() < self._timeout:
+        # if the process is running and before timeout (or without timeout)
+        # `Popen.poll` latches the return code, no more wait syscalls after the exit
+        retn = self._proc.poll()
+        if retn is None and (self._timeout is None or time() < self._timeout):
             return None
         # clear
         self.clear()
@@ -211,6 +579,14 @@ class LibFuzzer(Fuzzer):
             else TimeoutError(f"fuzzer process {self.path} timeout")
         )
 
+    def wait(self, timeout: float):
+        """Wait for the fuzzer process to exit, at most `timeout` seconds.
+        Args:
+            timeout: the maximum waiting time in seconds.
+        """
+        if self._proc is not None:
+            _wait_exit(self._proc, timeout)
+
     def halt(self) -> int | Exception:
         """Stop the fuzzer.
         Returnss:
@@ -242,10 +618,16 @@ class LibFuzzer(Fuzzer):
         """
         # assign default value
         _logfile = _logfile or f"{self.path}.log"
-        with open(_logfile, errors="replace") as f:
-            log = f.read()
-        # `#614201 REDUCE cov: 253 ft: 1249 corp: 455/35kb lim: 1188 exec/s: 153550 rss: 493Mb L: 520/1003 MS: 1 EraseBytes-`
-        index = log.rfind("cov")
+        # read the tail only, extend the window if the status line is not found
+        with open(_logfile, "rb") as f:
+            size, window = f.seek(0, os.SEEK_END), 8192
+            while True:
+                f.seek(max(size - window, 0))
+                log = f.read().decode("utf-8", errors="replace")
+                # `#614201 REDUCE cov: 253 ft: 1249 corp: 455/35kb lim: 1188 exec/s: 153550 rss: 493Mb L: 520/1003 MS: 1 EraseBytes-`
+                if (index := log.rfind("cov")) != -1 or window >= size:
+                    break
+                window *= 2
         if index == -1:
             return 0
         _, cov, _ = log[index:].split(maxsplit=2)
@@ -257,114 +639,233 @@ class LibFuzzer(Fuzzer):
         target: str | None = None,
         _profile: str | None = None,
         _remove_previous_profdata: bool = True,
+        mode: str = "full",
     ) -> Coverage:
         """Collect the coverage w.r.t. the given library.
         Args:
             itself: whether compute the branch coverage of the harness itself or target library.
             target: a path to the target library.
                 if it is not provided, assume it as `self.libpath` if `not itself`, otherwise `self.path`.
+            mode: the coverage to collect, `lines`, `branches` or `full`.
             _profile: a path to the coverage profiling file, assume it as f"{self.path}.profraw" if it is not provded.
         Returns:
             collected coverage.
         """
         # assign default value
         _profile = _profile or f"{self.path}.profraw"
-        _merged = _profile.replace(".profraw", ".profdata")
+        _merged = self._merge_profile(_profile, _remove_previous_profdata)
+        return self._export_coverage(
+            target or (self.path if itself else self.libpath), _merged, mode
+        )
+
+    def _merge_profile(
+        self,
+        _profile: str | list[str],
+        _remove_previous_profdata: bool = True,
+        _merged: str | None = None,
+    ) -> str:
+        """Merge the raw profiles into the indexed profile data.
+        Args:
+            _profile: a path or a list of paths to the coverage profiling files.
+            _merged: a path to the merged profile data, replace the extension of the first profile if it is not provided.
+        Returns:
+            a path to the merged profile data.
+        """
+        _profiles = [_profile] if isinstance(_profile, str) else _profile
+        _merged = _merged or _profiles[0].replace(".profraw", ".profdata")
+        # skip if the raw profiles are not changed since the last merge
+        key = None
+        try:
+            stats = [os.stat(path) for path in _profiles]
+            key = tuple(
+                (path, st.st_size, st.st_mtime_ns) for path, st in zip(_profiles, stats)
+            )
+            latest = max(st.st_mtime_ns for st in stats)
+            if (
+                self._merges.get(_merged) == key
+                and os.stat(_merged).st_mtime_ns >= latest
+            ):
+                return _merged
+        except FileNotFoundError:
+            # let llvm-profdata report the missing profiles
+            pass
+        self._merges.pop(_merged, None)
         if os.path.exists(_merged) and _remove_previous_profdata:
             os.remove(_merged)
-        # merge the raw profile
+        # merge the raw profile, skip the invalid ones, e.g. the fuzzer killed while writing
+        inputs, manifest = _profiles, None
+        if len(_profiles) > 1:
+            # pass through the file, free from the argv length limits
+            fd, manifest = tempfile.mkstemp(suffix=".txt")
+            with os.fdopen(fd, "w") as f:
+                f.writelines(f"{path}\n" for path in _profiles)
+            inputs = [f"--input-files={manifest}"]
         try:
             run = subprocess.run(
-                ["llvm-profdata", "merge", "-sparse", _profile, "-o", _merged],
+                [
+                    _which("llvm-profdata"),
+                    "merge",
+                    "-sparse",
+                    "--failure-mode=all",
+                    *inputs,
+                    "-o",
+                    _merged,
+                ],
                 capture_output=True,
+                close_fds=False,
             )
             run.check_returncode()
         except subprocess.CalledProcessError as e:
             raise RuntimeError(
                 f"failed to merge the raw profile data `{_profile}` to `{_merged}`: {run.stderr}"
             ) from e
-        # return the coverage
+        finally:
+            if manifest is not None:
+                os.remove(manifest)
+        if key is not None:
+            self._merges[_merged] = key
+        return _merged
+
+    def _export_coverage(
+        self, target: str, _merged: str, mode: str = "full"
+    ) -> Coverage:
+        """Export the coverage of the target from the merged profile data.
+        Args:
+            target: a path to the target binary, the library or the harness itself.
+            _merged: a path to the merged profile data.
+            mode: the coverage to export, `lines`, `branches` or `full`.
+        Returns:
+            collected coverage.
+        """
+        # equivalent to `os.path.abspath`, without `os.getcwd` per file
+        cwd = os.getcwd()
+        # reuse the previous export if neither the raw profiles nor the target are changed
+        export, stamp = (target, _merged, mode, cwd), None
+        if (merged := self._merges.get(_merged)) is not None:
+            try:
+                stats = [os.stat(path) for path in (target, _merged)]
+                stamp = (merged, *((st.st_size, st.st_mtime_ns) for st in stats))
+            except FileNotFoundError:
+                # let llvm-cov report the missing files
+                pass
+        if stamp is not None and (cached := self._exports.get(export)) is not None:
+            if cached[0] == stamp:
+                # shallow copy, `Coverage.merge` reassigns the fields
+                return Coverage(functions=cached[1].functions, lines=cached[1].lines)
         cov: dict
-        try:
-            run = subprocess.run(
+        # spool stderr to the file, preventing the pipe from blocking the export
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(
                 [
-                    "llvm-cov",
+                    _which("llvm-cov"),
                     "export",
-                    target or (self.path if itself else self.libpath),
+                    target,
                     "-format=lcov",
                     f"--instr-profile={_merged}",
                 ],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                close_fds=False,
+                bufsize=_EXPORT_BUFSIZE,
             )
-            run.check_returncode()
-            cov = parse_lcov(run.stdout.decode("utf-8"))
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(
-                f"failed to extract the coverage from the profile data `{_merged}`: {run.stderr}"
-            ) from e
-        except Exception as e:
-            raise RuntimeError(
-                f"failed to parse the lcov-format coverate data from profile `{_merged}`: {e}"
-            ) from e
-        # pack to coverage
-        packed = Coverage()
-        for filename, filelevel in cov.items():
-            packed.merge(
-                Coverage(
-                    functions={
-                        fn: {
-                            f"L{lineno}#({blockno}, {branchno})": hit or 0
-                            for lineno, branches in info["branches"].items()
-                            for (blockno, branchno), hit in branches.items()
-                        }
-                        for fn, info in filelevel["functions"].items()
-                    },
-                    lines={
-                        os.path.abspath(filename): {
-                            str(lineno): hit
-                            for lineno, hit in filelevel["lines"].items()
-                        }
-                    },
+            # parse the records as soon as they are written
+            # lcov is newline-terminated, skip the universal newline translation
+            with proc, io.TextIOWrapper(
+                proc.stdout, encoding="utf-8", newline="\n"
+            ) as stdout:
+                try:
+                    cov = dict(parse_lcov_stream(stdout, mode))
+                except Exception as e:
+                    proc.kill()
+                    raise RuntimeError(
+                        f"failed to parse the lcov-format coverate data from profile `{_merged}`: {e}"
+                    ) from e
+            if proc.returncode != 0:
+                stderr.seek(0)
+                raise RuntimeError(
+                    f"failed to extract the coverage from the profile data `{_merged}`: {stderr.read()}"
                 )
-            )
-        return packed
+        # pack to coverage, accumulating the hits of the duplicated entries
+        functions, lines = {}, {}
+        # string branch ids for serialization, `L{lineno}#({blockno}, {branchno})`
+        # format the suffixes once, the block and branch numbers are few and repeated
+        suffixes: dict[tuple[int, int], str] = {}
+        for filename, filelevel in cov.items():
+            if mode != "lines":
+                for fn, info in filelevel["functions"].items():
+                    branches = functions.setdefault(fn, {})
+                    for lineno, _branches in info["branches"].items():
+                        prefix = f"L{lineno}"
+                        for pair, hit in _branches.items():
+                            if (suffix := suffixes.get(pair)) is None:
+                                suffix = suffixes[pair] = f"#({pair[0]}, {pair[1]})"
+                            id_ = prefix + suffix
+                            branches[id_] = branches.get(id_, 0) + (hit or 0)
+            if mode != "branches":
+                filename = os.path.normpath(os.path.join(cwd, filename))
+                filelines = lines.setdefault(filename, {})
+                for lineno, hit in filelevel["lines"].items():
+                    key = str(lineno)
+                    filelines[key] = filelines.get(key, 0) + hit
+        if stamp is not None:
+            self._exports[export] = (stamp, Coverage(functions=functions, lines=lines))
+        return Coverage(functions=functions, lines=lines)
 
 
 def _batch_run_proxy(
-    args: tuple[LibFuzzer, str, str | None, float | None, int | None, bool]
+    args: tuple[
+        str, str, bool, str, str, str | None, float | None, int | None, bool, str | None
+    ]
 ):
     # unpack
-    fuzzer, corpus_dir, fuzzdict, timeout, runs, return_cov = args
-    # clone for seperating working directory
-    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as _workdir:
-        fuzzer = LibFuzzer(
-            fuzzer.path,
-            fuzzer.libpath,
-            fuzzer.minimize_corpus,
-            _workdir=_workdir,
+    (
+        path,
+        libpath,
+        minimize_corpus,
+        _root,
+        corpus_dir,
+        fuzzdict,
+        timeout,
+        runs,
+        return_cov,
+        _profdir,
+    ) = args
+    # reuse the working directory of the worker, seperated from the others
+    _workdir = os.path.join(_root, str(os.getpid()))
+    _clear_dir(_workdir)
+    fuzzer = LibFuzzer(path, libpath, minimize_corpus, jobs=1, _workdir=_workdir)
+    _profile = os.path.join(fuzzer._workdir, "default.profraw")
+    if _profdir is not None:
+        # online merging into the pool of the shared raw profiles
+        _profile = os.path.join(_profdir, "%4m.profraw")
+    # run the fuzzer, pinned to the cpu of the worker
+    try:
+        retn = fuzzer.run(
+            corpus_dir,
+            fuzzdict,
+            wait_until_done=True,
+            timeout=timeout,
+            runs=runs,
+            _profile=_profile,
+            # the log is not tracked in batch, skip writing it to the disk
+            _logfile=os.devnull,
+            _cpu=_CPU,
         )
-        _profile = os.path.join(fuzzer._workdir, "default.profraw")
-        # run the fuzzer
-        try:
-            retn = fuzzer.run(
-                corpus_dir,
-                fuzzdict,
-                wait_until_done=True,
-                timeout=timeout,
-                runs=runs,
-                _profile=_profile,
-                _logfile=os.path.join(fuzzer._workdir, "log"),
-            )
-        except Exception as e:
-            return corpus_dir, e, None
+    except Exception as e:
+        return corpus_dir, e, None
 
-        if not return_cov:
-            return corpus_dir, retn, None
-        # extract coverage
-        try:
-            cov_lib = fuzzer.coverage(_profile=_profile)
-            cov_fuz = fuzzer.coverage(itself=True, _profile=_profile)
-        except Exception as e:
-            return corpus_dir, e, None
+    if not return_cov:
+        return corpus_dir, retn, None
+    # extract coverage, merge once and export the library and the harness concurrently
+    # the line coverage is only required for the harness itself, e.g. critical path
+    try:
+        _merged = fuzzer._merge_profile(_profile)
+        with ThreadPool(2) as pool:
+            cov_lib, cov_fuz = pool.starmap(
+                lambda target, mode: fuzzer._export_coverage(target, _merged, mode),
+                [(fuzzer.libpath, "full"), (fuzzer.path, "lines")],
+            )
+    except Exception as e:
+        return corpus_dir, e, None
 
     return corpus_dir, retn, (cov_lib, cov_fuz)
@@ -1,110 +1,147 @@
+import bisect
 import collections
+from typing import Iterable, Iterator
 
 from tqdm.auto import tqdm
 
+# record prefixes to skip for the parsing modes
+_SKIPS = {"full": (), "lines": ("BRDA:",), "branches": ("DA:",)}
 
-def parse_lcov(lcov: str, verbose: bool = False) -> dict[str, dict]:
+
+def parse_lcov(lcov: str, verbose: bool = False, mode: str = "full") -> dict[str, dict]:
     """Parse the lcov data.
     Args:
         lcov: file content of the lcov-format profiling coverage.
+        mode: the coverage to parse, `lines`, `branches` or `full`.
     Returns:
         structured data about the coverage about the lines, branches, functions and files.
     """
     # split into file-level units
     files = [
-        file.strip().split("\n")
+        [line.strip() for line in file.strip().split("\n")]
         for file in lcov.strip().split("end_of_record")
         if len(file.strip()) > 0
     ]
     assert all(file.startswith("SF:") for file, *_ in files)
 
-    results = {}
     if verbose:
         files = tqdm(files)
-    for file, *contents in files:
-        filename = file[len("SF:") :]
-        # template
-        parsed = {
-            "__meta__": {
-                "functions": {"found": None, "hit": None},
-                "lines": {"found": None, "hit": None},
-                "branches": {"found": None, "hit": None},
-            },
-            "functions": collections.defaultdict(dict),
-            "lines": {},
-            "branches": collections.defaultdict(dict),
-        }
-        results[filename] = parsed
-        # parse the lcov-format contents
-        for item in contents:
-            type_, *args = item.strip().split(":")
-            args = ":".join(args)
-            match type_:
-                case "FN":
-                    lineno, filename = args.split(",")
-                    parsed["functions"][filename]["lineno"] = int(lineno)
-                case "FNDA":
-                    execution, filename = args.split(",")
-                    parsed["functions"][filename]["execution"] = int(execution)
-                case "FNF":
-                    parsed["__meta__"]["functions"]["found"] = int(args)
-                case "FNH":
-                    parsed["__meta__"]["functions"]["hit"] = int(args)
-                case "DA":
-                    lineno, execution, *_ = args.split(",")
-                    assert len(_) <= 1, f"unknown item, {item}"
-                    parsed["lines"][int(lineno)] = int(execution)
-                case "BRDA":
-                    lineno, blockno, branchno, taken = args.split(",")
-                    parsed["branches"][int(lineno)][(int(blockno), int(branchno))] = (
-                        None if taken == "-" else int(taken)
-                    )
-                case "LF":
-                    parsed["__meta__"]["lines"]["found"] = int(args)
-                case "LH":
-                    parsed["__meta__"]["lines"]["hit"] = int(args)
-                case "BRF":
-                    parsed["__meta__"]["branches"]["found"] = int(args)
-                case "BRH":
-                    parsed["__meta__"]["branches"]["hit"] = int(args)
-                case _:
-                    assert False, f"unknown item, {item}"
-        # sort with line number
-        functions = sorted(
-            parsed.pop("functions").items(), key=lambda x: x[1]["lineno"]
-        )
+    return dict(_parse_record(file, contents, mode) for file, *contents in files)
+
 
-        # find the function name within the line number
-        def _find(lineno: int) -> str | None:
-            try:
-                return next(
-                    k
-                    for (k, start), (_, end) in zip(
-                        functions, functions[1:] + [(None, None)]
-                    )
-                    if start["lineno"] <= lineno
-                    and (end is None or lineno < end["lineno"])
+def parse_lcov_stream(
+    lines: Iterable[str], mode: str = "full"
+) -> Iterator[tuple[str, dict]]:
+    """Parse the lcov data incrementally, record by record.
+    Args:
+        lines: lines of the lcov-format profiling coverage, e.g. text stream of the `llvm-cov export`.
+        mode: the coverage to parse, `lines`, `branches` or `full`.
+    Returns:
+        filenames and their structured data, in the same structure with `parse_lcov`.
+    """
+    record = []
+    for line in lines:
+        line = line.strip()
+        if line == "end_of_record":
+            if record:
+                file, *contents = record
+                assert file.startswith("SF:")
+                yield _parse_record(file, contents, mode)
+            record = []
+        elif line:
+            record.append(line)
+    if record:
+        file, *contents = record
+        assert file.startswith("SF:")
+        yield _parse_record(file, contents, mode)
+
+
+def _parse_record(
+    file: str, contents: list[str], mode: str = "full"
+) -> tuple[str, dict]:
+    """Parse the file-level unit of the lcov data.
+    Args:
+        file: `SF:` line of the record.
+        contents: the remaining lines of the record.
+        mode: the coverage to parse, `lines`, `branches` or `full`.
+            the line or branch records are left empty if they are not requested.
+    Returns:
+        filename and its structured data.
+    """
+    filename = file[len("SF:") :]
+    # template
+    parsed = {
+        "__meta__": {
+            "functions": {"found": None, "hit": None},
+            "lines": {"found": None, "hit": None},
+            "branches": {"found": None, "hit": None},
+        },
+        "lines": {},
+        "branches": collections.defaultdict(dict),
+    }
+    # parse the lcov-format contents
+    skips = _SKIPS[mode]
+    # {FUNCTION_NAME: [LINENO, EXECUTION]}
+    meta, fns = parsed["__meta__"], {}
+    line_hits, branch_hits = parsed["lines"], parsed["branches"]
+    for item in contents:
+        if item.startswith(skips):
+            continue
+        type_, _, args = item.partition(":")
+        # ordered by the frequency, line and branch records are the majority
+        match type_:
+            case "DA":
+                lineno, execution, *_ = args.split(",")
+                assert len(_) <= 1, f"unknown item, {item}"
+                line_hits[int(lineno)] = int(execution)
+            case "BRDA":
+                lineno, blockno, branchno, taken = args.split(",")
+                branch_hits[int(lineno)][(int(blockno), int(branchno))] = (
+                    None if taken == "-" else int(taken)
                 )
-            except StopIteration:
-                return None
+            case "FN":
+                lineno, function = args.split(",")
+                fns[function] = [int(lineno), None]
+            case "FNDA":
+                execution, function = args.split(",")
+                fns[function][1] = int(execution)
+            case "FNF":
+                meta["functions"]["found"] = int(args)
+            case "FNH":
+                meta["functions"]["hit"] = int(args)
+            case "LF":
+                meta["lines"]["found"] = int(args)
+            case "LH":
+                meta["lines"]["hit"] = int(args)
+            case "BRF":
+                meta["branches"]["found"] = int(args)
+            case "BRH":
+                meta["branches"]["hit"] = int(args)
+            case _:
+                assert False, f"unknown item, {item}"
+    # sort with line number
+    functions = sorted(fns.items(), key=lambda x: x[1][0])
+    starts = [lineno for _, (lineno, _) in functions]
+    # (branches, lines) of each function, in the same order with `functions`
+    units = [({}, {}) for _ in functions]
 
-        # reorder within the function-unit
-        branches = collections.defaultdict(dict)
-        for lineno, _branches in parsed["branches"].items():
-            branches[_find(lineno)][lineno] = _branches
+    # reorder within the function-unit, the last one starting before the line
+    for lineno, _branches in branch_hits.items():
+        if i := bisect.bisect_right(starts, lineno):
+            units[i - 1][0][lineno] = _branches
 
-        lines = collections.defaultdict(dict)
-        for lineno, execution in parsed["lines"].items():
-            lines[_find(lineno)][lineno] = execution
-        # reassign
-        parsed["functions"] = {
-            function: {
-                "branches": branches.get(function, {}),
-                "lines": lines.get(function, {}),
-                "execution": v["execution"],
-                "lineno": v["lineno"],
-            }
-            for function, v in functions
+    for lineno, execution in line_hits.items():
+        if i := bisect.bisect_right(starts, lineno):
+            units[i - 1][1][lineno] = execution
+    # reassign
+    parsed["functions"] = {
+        function: {
+            "branches": branches,
+            "lines": lines,
+            "execution": execution,
+            "lineno": lineno,
         }
+        for (function, (lineno, execution)), (branches, lines) in zip(functions, units)
+    }
 
-    return results
+    return filename, parsed
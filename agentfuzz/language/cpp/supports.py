@@ -1,10 +1,11 @@
 import os
 import tempfile
 from dataclasses import dataclass, field
+from multiprocessing.pool import ThreadPool
 
 from tqdm.auto import tqdm
 
-from agentfuzz.analyzer import APIGadget, Factory
+from agentfuzz.analyzer import APIGadget, Factory, _walk_files
 from agentfuzz.config import Config
 from agentfuzz.language.cpp.ast import ClangASTParser
 from agentfuzz.language.cpp.compiler import Clang, _CXXFLAGS
@@ -43,12 +44,11 @@ class CppFactory(Factory):
             a list of the header files.
         """
         include_dir = self.config.include_dir or [self.config.srcdir]
+        postfix = tuple(self.config.postfix)
         return [
-            (dir_, os.path.relpath(os.path.join(root, filename), dir_))
+            (dir_, os.path.relpath(path, dir_))
             for dir_ in include_dir
-            for root, _, files in os.walk(dir_)
-            for filename in files
-            if filename.endswith(tuple(self.config.postfix))
+            for path in _walk_files(dir_, postfix)
         ]
 
 
@@ -70,13 +70,18 @@ class CppSupports(LanguageSupports):
             factory=self._Factory(
                 workdir,
                 config,
-                ClangASTParser(clang=config.clang, include_dir=config.include_dir),
+                ClangASTParser(
+                    clang=config.clang,
+                    include_dir=config.include_dir,
+                    _cache_dir=os.path.join(workdir, ".cache", "ast"),
+                ),
                 Clang(
                     libpath=config.libpath,
                     links=config.links,
                     include_dir=config.include_dir,
                     clang=config.clang,
                     flags=config.flags,
+                    _cache_dir=os.path.join(workdir, ".cache", "pch"),
                 ),
             ),
         )
@@ -95,19 +100,26 @@ class CppSupports(LanguageSupports):
         _hook: bool = False,
         _errfile: str | None = None,
         _verbose: bool = True,
+        _workers: int | None = None,
+        _link: bool = False,
     ) -> list[APIGadget]:
         """Check the API compilability.
         Args:
-            _hook: whether hook the `Factory.listup_apis` to only compilable APIs or not.
+            _hook: whether hook the `Factory.listup_apis` and `Factory.listup_gadgets` to only compilable APIs or not.
+            _workers: the number of the concurrent compilations, use `os.cpu_count()` if it is not provided.
+            _link: whether link the probes to the library, checking the symbols are exported, or only check the syntax.
         Returns:
             compilable APIs.
         """
-        passed = []
-        temp = tempfile.mktemp(suffix=f".{self.factory.config.ext}")
-        for api in tqdm(self.factory.listup_apis()):
-            with open(temp, "w") as f:
-                f.write(
-                    f"""
+        apis = self.factory.listup_apis()
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as _tempdir:
+
+            def _probe(args: tuple[int, APIGadget]) -> Exception | None:
+                i, api = args
+                temp = os.path.join(_tempdir, f"harness_{i}.{self.factory.config.ext}")
+                with open(temp, "w") as f:
+                    f.write(
+                        f"""
 #include <stdlib.h>
 #include <stdint.h>
 #include "{api._meta["__source__"]}"
@@ -116,17 +128,40 @@ extern "C" int LLVMFuzzerTestOneInput(const uint8_t* data, size_t size) {{
 (void){api.name};
 }}
 """
+                    )
+                # the leading includes are precompiled once per source, shared by its apis
+                headers = ["<stdlib.h>", "<stdint.h>", f'"{api._meta["__source__"]}"']
+                try:
+                    if _link:
+                        self.factory.compiler.compile(temp, _headers=headers)
+                    else:
+                        self.factory.compiler.syntax_check(temp, _headers=headers)
+                except Exception as e:
+                    return e
+                return None
+
+            passed = []
+            # compiler processes are independent, threads only wait for them
+            workers = min(_workers or os.cpu_count() or 1, max(len(apis), 1))
+            with ThreadPool(workers) as pool:
+                errors = pool.imap(_probe, enumerate(apis))
+                # coalesce the refreshes, the probes complete in bursts
+                errors = tqdm(
+                    errors,
+                    total=len(apis),
+                    miniters=max(1, len(apis) // 200),
+                    mininterval=0.5,
                 )
-            try:
-                self.factory.compiler.compile(temp)
-                passed.append(api)
-            except Exception as e:
-                if _verbose:
-                    print(f"{api.signature()}: COMPILE FAILURE, {e}\n")
-                if _errfile:
-                    with open(_errfile, "a") as f:
-                        f.write(f"{api.signature()}: COMPILE FAILURE\n{e}\n\n")
-        os.remove(temp)
+                for api, e in zip(apis, errors):
+                    if e is None:
+                        passed.append(api)
+                        continue
+                    if _verbose:
+                        print(f"{api.signature()}: COMPILE FAILURE, {e}\n")
+                    if _errfile:
+                        with open(_errfile, "a") as f:
+                            f.write(f"{api.signature()}: COMPILE FAILURE\n{e}\n\n")
         if _hook:
             self.factory.listup_apis = lambda: passed
+            self.factory.listup_gadgets = lambda: (passed, self.factory.listup_types())
         return passed
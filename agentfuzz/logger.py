@@ -1,4 +1,7 @@
+import atexit
 from datetime import datetime, timedelta, timezone
+from time import time
+from typing import TextIO
 
 
 class Logger:
@@ -22,15 +25,29 @@ class Logger:
             _timezone = timezone(timedelta(hours=_timezone))
         self._timezone = _timezone
         self._verbose_method = _verbose_method
+        # opened on the first log, the default loggers are constructed at import time
+        self._file: TextIO | None = None
+        # formatted timestamp of the last logged second
+        self._timestamp: tuple[int, str] = (-1, "")
 
     def log(self, msg: str):
         """Write the log into the file and verbose to the terminal if verbose option is on.
         Args:
             msg: a log message.
         """
-        timestamp = datetime.now(self._timezone).strftime("%Y.%m.%dT%H:%M:%S")
-        msg = f"[{timestamp}] {msg}\n"
-        with open(self.path, "a") as f:
-            f.write(msg)
+        now = int(time())
+        if self._timestamp[0] != now:
+            formatted = datetime.fromtimestamp(now, self._timezone).strftime(
+                "%Y.%m.%dT%H:%M:%S"
+            )
+            self._timestamp = (now, formatted)
+        msg = f"[{self._timestamp[1]}] {msg}\n"
+        if self._file is None or self._file.closed or self._file.name != self.path:
+            if self._file is not None:
+                self._file.close()
+            # line-buffered, a single write per message
+            self._file = open(self.path, "a", buffering=1)
+            atexit.register(self._file.close)
+        self._file.write(msg)
         if self.verbose:
             self._verbose_method(msg)
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from agentfuzz.language.cpp.ast import ClangASTParser, _unmangled_name
+
+
+def test_unmangled_name():
+    # free functions, with the internal linkage and in the namespace
+    assert _unmangled_name("_Z3foov") == "foo"
+    assert _unmangled_name("_ZL3foov") == "foo"
+    assert _unmangled_name("_ZN2ns4wrapEv") == "wrap"
+    # members of the class templates
+    assert _unmangled_name("_ZN3FooIiE3barEv") == "bar"
+    assert _unmangled_name("_ZN5outer5innerIiE3barEv") == "bar"
+    assert _unmangled_name("_ZN3FooILi3EE3barEv") == "bar"
+    # constructors and destructors
+    assert _unmangled_name("_ZN3FooC2Ev") == "Foo"
+    assert _unmangled_name("_ZN3FooIiEC2Ev") == "Foo"
+    assert _unmangled_name("_ZN3FooD1Ev") == "~Foo"
+    # function templates and the standard substitutions
+    assert _unmangled_name("_Z3maxIiET_S0_S0_") == "max"
+    assert _unmangled_name("_ZNSt6vectorIiSaIiEE9push_backERKi") == "push_back"
+    # operators are not supported
+    assert _unmangled_name("_ZN3FooplERKS_") is None
+    assert _unmangled_name("foo") is None
+
+
+def test_find_gadget():
+    parser = ClangASTParser()
+    gadgets = {name: SimpleNamespace(name=name) for name in ("Foo", "bar", "baz")}
+    assert parser._find_gadget("bar", gadgets).name == "bar"
+    # template members resolve to the method, not the enclosing class
+    assert parser._find_gadget("_ZN3FooIiE3barEv", gadgets).name == "bar"
+    assert parser._find_gadget("_ZN5outer5innerIiE3barEv", gadgets).name == "bar"
+    assert parser._find_gadget("_ZL3bazv", gadgets).name == "baz"
+    assert parser._find_gadget("_ZN3FooC2Ev", gadgets).name == "Foo"
+    # fallback to the pattern if the unmangled name is not a gadget
+    assert parser._find_gadget("_ZN3QuxplERK3baz", gadgets).name == "baz"
+    assert parser._find_gadget("_ZN3Qux4quuxEv", gadgets) is None